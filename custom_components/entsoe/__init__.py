@@ -6,17 +6,52 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 from .const import (
+    AREA_INFO,
     CONF_COORDINATOR,
+    CONF_HUBS,
     DOMAIN,
     CONF_API_KEY,
     CONF_AREA,
+    CONF_AREAS,
     CONF_TZ,
+    CONF_ARCHIVE_DAYS,
+    CONF_RESOLUTION,
+    CONF_PERCENTILES,
+    CONF_THRESHOLDS,
+    DEFAULT_ARCHIVE_DAYS,
+    DEFAULT_PERCENTILES,
+    DEFAULT_RESOLUTION,
 )
 from .coordinator import EntsoeCoordinator
+from .hub import async_acquire_hub, async_release_hub
+from .tariff import Tariff
+from .services import async_setup_services
+from .templates import (
+    async_setup_template_functions,
+    async_unload_template_functions,
+)
+from .thresholds import THRESHOLD_SCHEMA
+from .websocket import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
-PLATFORMS = [Platform.SENSOR]
+PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the ENTSO-e prices component."""
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    return True
+
+
+def entry_areas(entry: ConfigEntry) -> list[str]:
+    """Return the zones of an entry, entries from before multi-zone support have one."""
+    return entry.options.get(CONF_AREAS) or [entry.options[CONF_AREA]]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -24,21 +59,46 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Initialise the coordinator and save it as domain-data
     api_key = entry.options[CONF_API_KEY]
-    area = entry.options[CONF_AREA]
     timezone = entry.options[CONF_TZ]
+    archive_days = entry.options.get(CONF_ARCHIVE_DAYS, DEFAULT_ARCHIVE_DAYS)
+
+    # Entries in the same bidding zone share one hub, so the zone is fetched only once
+    hubs = {}
+    for area in entry_areas(entry):
+        if AREA_INFO[area]["code"] not in hubs:
+            hub = await async_acquire_hub(hass, api_key, area, timezone, archive_days)
+            hubs[hub.area] = hub
     entsoe_coordinator = EntsoeCoordinator(
-        hass, api_key=api_key, area=area, timezone=timezone
+        hass,
+        hubs=hubs,
+        timezone=timezone,
+        resolution=entry.options.get(CONF_RESOLUTION, DEFAULT_RESOLUTION),
+        tariff=Tariff.from_options(entry.options),
+        percentiles=entry.options.get(CONF_PERCENTILES, DEFAULT_PERCENTILES),
+        thresholds=THRESHOLD_SCHEMA(entry.options.get(CONF_THRESHOLDS) or []),
     )
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         CONF_COORDINATOR: entsoe_coordinator,
+        CONF_HUBS: hubs,
+        # released as subscribed, the options already changed when an update reloads
+        CONF_API_KEY: api_key,
+        CONF_TZ: timezone,
     }
 
     # Fetch initial data, so we have data when entities subscribe and set up the platform
-    await entsoe_coordinator.async_config_entry_first_refresh()
+    try:
+        await entsoe_coordinator.async_config_entry_first_refresh()
+    except Exception:
+        hass.data[DOMAIN].pop(entry.entry_id)
+        for hub in hubs.values():
+            async_release_hub(hass, hub, timezone, api_key)
+        raise
+    async_setup_template_functions(hass)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_update_options))
+    entry.async_on_unload(entsoe_coordinator.async_shutdown)
 
     return True
 
@@ -47,7 +107,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        for hub in entry_data[CONF_HUBS].values():
+            async_release_hub(
+                hass, hub, entry_data[CONF_TZ], entry_data[CONF_API_KEY]
+            )
+        # the template functions go with the last entry
+        if not any(
+            isinstance(data, dict) and CONF_COORDINATOR in data
+            for data in hass.data[DOMAIN].values()
+        ):
+            async_unload_template_functions(hass)
 
     return unload_ok
 
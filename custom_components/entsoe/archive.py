@@ -0,0 +1,127 @@
+"""Persistent price archive for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt
+
+from .const import (
+    ARCHIVE_SAVE_DELAY,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+from .series import PriceSeries
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PriceArchive:
+    """Day-ahead prices of one bidding zone, kept on disk between restarts.
+
+    Prices are stored in €/MWh keyed by their UTC start time, exactly as
+    returned by ENTSO-e, and pruned to the configured number of days. The
+    archive keeps the finest resolution it has seen; when ENTSO-e switches a
+    zone from 60 to 15 minute units, older hourly prices are repeated per
+    quarter so the archive stays equidistant.
+    """
+
+    def __init__(self, hass: HomeAssistant, area, days) -> None:
+        """Initialize the archive of a bidding zone code."""
+        self.area = area
+        self.days = days
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.archive.{area}")
+        self.resolution = 3600
+        self._prices: dict[int, float] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored prices."""
+        stored = await self._store.async_load()
+        if stored is not None:
+            self.resolution = stored.get("resolution", 3600)
+            self._prices = {
+                int(datetime.fromisoformat(key).timestamp()): price
+                for key, price in stored.get("prices", {}).items()
+            }
+        _LOGGER.debug(f"Loaded {len(self._prices)} archived prices for {self.area}")
+
+    def _data_to_save(self) -> dict:
+        """Return the archive in its stored, human readable form."""
+        return {
+            "resolution": self.resolution,
+            "prices": {
+                dt.utc_from_timestamp(epoch).isoformat(): price
+                for epoch, price in sorted(self._prices.items())
+            },
+        }
+
+    def missing(self, start_date: datetime, end_date: datetime):
+        """Return the (start, end) ranges within the window without an archived price."""
+        resolution = self.resolution
+        gaps = []
+        gap_start = gap_end = None
+        end = int(end_date.timestamp())
+        epoch = int(start_date.timestamp())
+        while epoch <= end:
+            if epoch in self._prices:
+                if gap_start is not None:
+                    gaps.append((gap_start, gap_end))
+                    gap_start = None
+            else:
+                if gap_start is None:
+                    gap_start = epoch
+                gap_end = epoch + resolution - 1
+            epoch += resolution
+        if gap_start is not None:
+            gaps.append((gap_start, gap_end))
+        return [
+            (dt.utc_from_timestamp(start), dt.utc_from_timestamp(end))
+            for start, end in gaps
+        ]
+
+    def covers(self, when: datetime) -> bool:
+        """Return if the archive has the price of the slot at a point in time."""
+        epoch = int(when.timestamp())
+        return epoch - epoch % self.resolution in self._prices
+
+    def add(self, data: PriceSeries) -> None:
+        """Merge fetched prices into the archive and schedule a save."""
+        if data.resolution < self.resolution:
+            factor = self.resolution // data.resolution
+            self._prices = {
+                epoch + part * data.resolution: price
+                for epoch, price in self._prices.items()
+                for part in range(factor)
+            }
+            self.resolution = data.resolution
+        data = data.expanded_to(self.resolution)
+        for when, price in data.items():
+            self._prices[int(when.timestamp())] = price
+        self.prune()
+        self._store.async_delay_save(self._data_to_save, ARCHIVE_SAVE_DELAY)
+
+    def prune(self) -> None:
+        """Forget prices older than the archive should keep."""
+        oldest = dt.start_of_local_day(dt.utcnow()) - timedelta(days=self.days)
+        oldest = int(oldest.timestamp())
+        for epoch in [epoch for epoch in self._prices if epoch < oldest]:
+            del self._prices[epoch]
+
+    def full_series(self) -> PriceSeries | None:
+        """Return all archived prices."""
+        return PriceSeries.from_points(self._prices, self.resolution)
+
+    def series(self, start_date: datetime, end_date: datetime):
+        """Return the archived prices within the window."""
+        start = int(start_date.timestamp())
+        end = int(end_date.timestamp())
+        return PriceSeries.from_points(
+            {
+                epoch: price
+                for epoch, price in self._prices.items()
+                if start <= epoch <= end
+            },
+            self.resolution,
+        )
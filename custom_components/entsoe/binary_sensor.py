@@ -0,0 +1,154 @@
+"""ENTSO-e price threshold binary sensors."""
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+
+from homeassistant.components.binary_sensor import (
+    DOMAIN as BINARY_SENSOR_DOMAIN,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import event
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt
+
+from .const import (
+    ATTRIBUTION,
+    CONF_COORDINATOR,
+    CONF_ENTITY_NAME,
+    DOMAIN,
+    PRICE_UNIT,
+)
+from .coordinator import EntsoeCoordinator
+from .thresholds import ATTR_ABOVE, ATTR_BELOW, ATTR_FINAL, Transitions, threshold_key
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up ENTSO-e price threshold binary sensors."""
+    entsoe_coordinator = hass.data[DOMAIN][config_entry.entry_id][CONF_COORDINATOR]
+
+    # Add a binary sensor for each threshold of each zone
+    async_add_entities(
+        EntsoeThresholdSensor(
+            entsoe_coordinator, rule, config_entry.options[CONF_ENTITY_NAME], area
+        )
+        for area in entsoe_coordinator.areas
+        for rule in entsoe_coordinator.thresholds
+    )
+
+
+class EntsoeThresholdSensor(CoordinatorEntity, BinarySensorEntity):
+    """On while the price of a zone is below (or above) a threshold.
+
+    The coordinator precomputes when the state flips across the known
+    prices; the sensor only keeps one timer, for the next flip, and ignores
+    the coordinator's slot ticks in between.
+    """
+
+    _attr_attribution = ATTRIBUTION
+
+    def __init__(
+        self,
+        coordinator: EntsoeCoordinator,
+        rule: dict,
+        name: str = "",
+        area: str | None = None,
+    ) -> None:
+        """Initialize the threshold sensor of a zone, the entry's first zone by default."""
+        self.rule = rule
+        self.key = threshold_key(rule)
+        self.area = area or coordinator.areas[0]
+
+        below = ATTR_BELOW in rule
+        self._attr_icon = "mdi:cash-minus" if below else "mdi:cash-plus"
+        label = f"Price {'Below' if below else 'Above'} {rule.get(ATTR_BELOW, rule.get(ATTR_ABOVE))} {PRICE_UNIT}"
+
+        prefix = f"{name}_" if name not in (None, "") else "entsoe_"
+        suffix = f" ({name})" if name not in (None, "") else ""
+        if len(coordinator.areas) > 1:
+            # entries with several zones get the zone in ids and names
+            prefix = f"{prefix}{self.area.lower()}_"
+            suffix = f" ({f'{name} ' if suffix else ''}{self.area})"
+        self.entity_id = f"{BINARY_SENSOR_DOMAIN}.{prefix}{self.key}"
+        self._attr_unique_id = f"entsoe.{prefix}{self.key}"
+        self._attr_name = f"[ENTSO-e] {rule['name']}: {label}{suffix}"
+        self._attr_extra_state_attributes = {
+            "threshold": rule.get(ATTR_BELOW, rule.get(ATTR_ABOVE)),
+            "final_price": rule[ATTR_FINAL],
+            "next_change": None,
+        }
+
+        self._transitions: Transitions | None = None
+        self._unsub_transition = None
+        self._was_available: bool | None = None
+
+        super().__init__(coordinator)
+
+    async def async_added_to_hass(self) -> None:
+        """Take the state from the current data and arm the transition timer."""
+        await super().async_added_to_hass()
+        self._was_available = self.available
+        self._set_transitions(self._current_transitions())
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the transition timer."""
+        await super().async_will_remove_from_hass()
+        self._cancel_transition()
+
+    def _current_transitions(self) -> Transitions | None:
+        if self.coordinator.data is None or self.area not in self.coordinator.data:
+            return None
+        return self.coordinator.data[self.area]["transitions"].get(self.key)
+
+    def _cancel_transition(self) -> None:
+        if self._unsub_transition:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    def _set_transitions(self, transitions: Transitions | None) -> None:
+        """Set the state and schedule the timer for the next flip."""
+        self._transitions = transitions
+        self._cancel_transition()
+        now = int(dt.utcnow().timestamp())
+        next_change = None
+        if transitions is not None:
+            self._attr_is_on = transitions.state_at(now)
+            next_change = transitions.next_change(now)
+        else:
+            self._attr_is_on = None
+        if next_change is not None:
+            self._unsub_transition = event.async_track_point_in_utc_time(
+                self.hass, self._handle_transition, dt.utc_from_timestamp(next_change)
+            )
+        self._attr_extra_state_attributes = {
+            **self._attr_extra_state_attributes,
+            "next_change": dt.utc_from_timestamp(next_change)
+            if next_change is not None
+            else None,
+        }
+
+    @callback
+    def _handle_transition(self, _now: datetime) -> None:
+        """Flip the state at a precomputed transition."""
+        self._unsub_transition = None
+        self._set_transitions(self._transitions)
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Reschedule only when the coordinator computed new transitions."""
+        transitions = self._current_transitions()
+        if transitions is self._transitions and self.available == self._was_available:
+            return
+        self._was_available = self.available
+        self._set_transitions(transitions)
+        self.async_write_ha_state()
@@ -0,0 +1,274 @@
+"""Asynchronous ENTSO-e Transparency Platform client."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import logging
+import math
+import re
+from time import perf_counter
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from aiohttp import ClientSession, ClientTimeout
+
+from .const import (
+    API_CHUNK_SIZE,
+    API_TIMEOUT,
+    API_URL,
+    AREA_EIC,
+)
+from .series import PriceSeries
+
+_LOGGER = logging.getLogger(__name__)
+
+_DURATION = re.compile(r"^PT(?:(\d+)H)?(?:(\d+)M)?$")
+
+
+class EntsoeError(Exception):
+    """Error talking to the ENTSO-e API."""
+
+
+class EntsoeAuthError(EntsoeError):
+    """The API key was rejected (HTTP 401)."""
+
+
+class EntsoeRateLimitError(EntsoeError):
+    """Too many requests (HTTP 429)."""
+
+    def __init__(self, message: str, retry_after: int | None = None) -> None:
+        """Initialize with the server's Retry-After, in seconds, if any."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class EntsoeUnavailableError(EntsoeError):
+    """The API is down for maintenance or overloaded (HTTP 503)."""
+
+
+class EntsoeCircuitOpenError(EntsoeError):
+    """Requests for the zone are paused after repeated failures; nothing was sent."""
+
+    def __init__(self, message: str, retry_at: datetime | None = None) -> None:
+        """Initialize with the time requests are let through again."""
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace of a tag."""
+    return tag.rpartition("}")[2]
+
+
+def _parse_resolution(value: str) -> int:
+    """Return an ISO-8601 duration like PT60M or PT15M in seconds."""
+    match = _DURATION.match(value)
+    if match is None:
+        raise EntsoeError(f"Unsupported resolution {value}")
+    hours, minutes = match.groups()
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60
+
+
+def _format_time(when: datetime) -> str:
+    """Return a time in the yyyyMMddHHmm UTC format the API expects."""
+    return when.astimezone(timezone.utc).strftime("%Y%m%d%H%M")
+
+
+class PriceDocumentParser:
+    """Incremental parser for Publication_MarketDocument price XML.
+
+    Chunks are fed as they arrive. Every Period is read as soon as it is
+    complete and then dropped, so at most one Period is held in memory.
+    Prices go straight into per-resolution point maps keyed by epoch.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty parser."""
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._curve_type = None
+        self.points: dict[int, dict[int, float]] = {}
+        self.reason: str | None = None
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse a chunk of the response body."""
+        self._parser.feed(chunk)
+        self._process()
+
+    def close(self) -> None:
+        """Finish parsing."""
+        self._parser.close()
+        self._process()
+
+    @property
+    def acknowledgement(self) -> bool:
+        """Return if the document is an Acknowledgement instead of prices."""
+        return self._root == "Acknowledgement_MarketDocument"
+
+    def _process(self) -> None:
+        for event, elem in self._parser.read_events():
+            name = _local_name(elem.tag)
+            if event == "start":
+                if self._root is None:
+                    self._root = name
+                continue
+            if name == "curveType":
+                self._curve_type = elem.text
+            elif name == "text" and self.acknowledgement:
+                self.reason = elem.text
+            elif name == "Period":
+                self._read_period(elem)
+                elem.clear()
+            elif name == "TimeSeries":
+                elem.clear()
+
+    def _read_period(self, period) -> None:
+        start = end = resolution = None
+        positions: dict[int, float] = {}
+        for child in period:
+            name = _local_name(child.tag)
+            if name == "timeInterval":
+                for bound in child:
+                    if _local_name(bound.tag) == "start":
+                        start = datetime.fromisoformat(bound.text)
+                    elif _local_name(bound.tag) == "end":
+                        end = datetime.fromisoformat(bound.text)
+            elif name == "resolution":
+                resolution = _parse_resolution(child.text)
+            elif name == "Point":
+                position = price = None
+                for field in child:
+                    field_name = _local_name(field.tag)
+                    if field_name == "position":
+                        position = int(field.text)
+                    elif field_name == "price.amount":
+                        price = float(field.text)
+                if position is not None and price is not None:
+                    positions[position] = price
+        if start is None or resolution is None or not positions:
+            return
+
+        points = self.points.setdefault(resolution, {})
+        epoch = int(start.timestamp())
+        if self._curve_type == "A03":
+            # A03 curves omit points whose price equals the previous one
+            last = max(positions)
+            if end is not None:
+                last = max(last, (int(end.timestamp()) - epoch) // resolution)
+            price = math.nan
+            for position in range(1, last + 1):
+                price = positions.get(position, price)
+                points[epoch + (position - 1) * resolution] = price
+        else:
+            for position, price in positions.items():
+                points[epoch + (position - 1) * resolution] = price
+
+
+def merge_resolutions(
+    points: dict[int, dict[int, float]]
+) -> tuple[int | None, dict[int, float]]:
+    """Return the finest resolution of a document and all its prices at that resolution.
+
+    A document spanning a zone's switch from 60 to 15 minute prices holds
+    both; coarser periods are repeated per finer slot, finer prices win where
+    both exist.
+    """
+    if not points:
+        return None, {}
+    resolution = min(points)
+    merged: dict[int, float] = {}
+    for coarse in sorted(points, reverse=True):
+        if coarse % resolution:
+            _LOGGER.warning(
+                f"Ignoring {coarse // 60} minute prices that don't fit {resolution // 60} minute ones"
+            )
+            continue
+        series = PriceSeries.from_points(points[coarse], coarse).expanded_to(resolution)
+        for index, price in enumerate(series.values):
+            if not math.isnan(price):
+                merged[series.start + index * resolution] = price
+    return resolution, merged
+
+
+class EntsoeClient:
+    """Query day-ahead prices over Home Assistant's shared aiohttp session."""
+
+    def __init__(
+        self, session: ClientSession, api_key: str, url: str = API_URL
+    ) -> None:
+        """Initialize the client."""
+        self._session = session
+        self._api_key = api_key
+        self._url = url
+        # size and parse time of the last response, read by the hub's metrics
+        self.last_payload = 0
+        self.last_parse_time = 0.0
+
+    async def query_day_ahead_prices(
+        self, area: str, start: datetime, end: datetime, resolution: int | None = None
+    ) -> PriceSeries | None:
+        """Return the prices of a bidding zone code in €/MWh, or None if not published.
+
+        Without a resolution, all prices are returned at the finest one in the
+        document.
+        """
+        params = {
+            "securityToken": self._api_key,
+            "documentType": "A44",
+            "in_Domain": AREA_EIC[area],
+            "out_Domain": AREA_EIC[area],
+            "periodStart": _format_time(start),
+            "periodEnd": _format_time(end),
+        }
+        parser = PriceDocumentParser()
+        payload = self.last_payload = 0
+        parse_time = self.last_parse_time = 0.0
+        async with self._session.get(
+            self._url, params=params, timeout=ClientTimeout(total=API_TIMEOUT)
+        ) as resp:
+            if resp.status == 401:
+                raise EntsoeAuthError("Unauthorized: Please check your API-key.")
+            if resp.status == 429:
+                retry_after = resp.headers.get("Retry-After")
+                raise EntsoeRateLimitError(
+                    "Too many requests to ENTSO-e",
+                    int(retry_after) if retry_after and retry_after.isdigit() else None,
+                )
+            if resp.status == 503:
+                raise EntsoeUnavailableError("ENTSO-e is temporarily unavailable")
+            if resp.status >= 400 and "xml" not in resp.content_type:
+                raise EntsoeError(f"ENTSO-e request failed with HTTP {resp.status}")
+            try:
+                async for chunk in resp.content.iter_chunked(API_CHUNK_SIZE):
+                    payload += len(chunk)
+                    begin = perf_counter()
+                    parser.feed(chunk)
+                    parse_time += perf_counter() - begin
+                begin = perf_counter()
+                parser.close()
+                parse_time += perf_counter() - begin
+            except ParseError as exc:
+                raise EntsoeError(f"Invalid response from ENTSO-e: {exc}") from exc
+            finally:
+                self.last_payload = payload
+                self.last_parse_time = parse_time
+
+            if parser.acknowledgement:
+                if parser.reason and "No matching data found" in parser.reason:
+                    return None
+                raise EntsoeError(f"ENTSO-e rejected the request: {parser.reason}")
+            if resp.status >= 400:
+                raise EntsoeError(f"ENTSO-e request failed with HTTP {resp.status}")
+
+        if resolution is None:
+            resolution, points = merge_resolutions(parser.points)
+        else:
+            points = parser.points.get(resolution)
+        if not points:
+            return None
+
+        # ENTSO-e answers with whole market days, keep only the requested range
+        first = int(start.timestamp())
+        last = int(end.timestamp())
+        return PriceSeries.from_points(
+            {epoch: price for epoch, price in points.items() if first <= epoch <= last},
+            resolution,
+        )
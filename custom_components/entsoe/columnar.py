@@ -0,0 +1,214 @@
+"""Append-only columnar price files of the ENTSO-e prices component.
+
+Every bidding zone gets `<config>/entsoe/<zone>.prices`, a headerless file of
+fixed-width little-endian records, one per priced slot in ascending time:
+
+    epoch       int64    UTC start of the slot
+    resolution  int32    slot length in seconds
+    price       float64  €/MWh, as published by ENTSO-e
+
+The file maps straight onto a numpy structured array, whose columns are
+zero-copy views:
+
+    prices = numpy.memmap("SE_3.prices", dtype=NUMPY_DTYPE, mode="r")
+    prices["price"][prices["epoch"] >= 1672531200]
+
+New slots are appended. A slot published late, before the last stored one,
+is merged in by writing a new file that atomically replaces the old one, so
+readers that mapped the old file keep a consistent view of it.
+
+All functions do blocking file I/O; call them in the executor.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterator
+import csv
+from datetime import datetime, timezone
+import math
+import mmap
+import os
+import struct
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .series import PriceSeries
+
+RECORD = struct.Struct("<qid")
+NUMPY_DTYPE = [("epoch", "<i8"), ("resolution", "<i4"), ("price", "<f8")]
+COLUMNS = ("time", "epoch", "resolution", "price")
+# no ENTSO-e slot is longer, a stored slot covering an epoch starts at most this before it
+MAX_RESOLUTION = 3600
+
+
+def price_file_path(hass: HomeAssistant, area: str) -> str:
+    """Return the path of the price file of a bidding zone code."""
+    return hass.config.path(DOMAIN, f"{area}.prices")
+
+
+class ColumnarPriceFile:
+    """The append-only price file of one bidding zone.
+
+    Slots after the last stored one are appended, so readers can map the
+    file while it grows. Earlier slots missing from the file are merged in;
+    slots overlapping a stored one keep the stored price, as first published,
+    which also keeps hourly history from being split into the quarters the
+    archive repeats it in after a switch to 15 minute prices.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the file at a path, it is created on the first append."""
+        self.path = path
+        # end of the last stored slot
+        self._end: int | None = None
+        self._checked = False
+
+    def _check(self) -> None:
+        """Drop a partial record left by an interrupted write, read where the file ends."""
+        self._checked = True
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        with open(self.path, "r+b") as file:
+            if size % RECORD.size:
+                size -= size % RECORD.size
+                file.truncate(size)
+            if size:
+                file.seek(size - RECORD.size)
+                epoch, resolution, _ = RECORD.unpack(file.read(RECORD.size))
+                self._end = epoch + resolution
+
+    def __len__(self) -> int:
+        """Return the number of stored slots."""
+        try:
+            return os.path.getsize(self.path) // RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, series: PriceSeries | None) -> int:
+        """Store the priced slots the file doesn't have yet, return how many."""
+        if not self._checked:
+            self._check()
+        if series is None:
+            return 0
+        records = bytearray()
+        late = []
+        epoch = series.start
+        for price in series.values:
+            if not math.isnan(price):
+                if self._end is None or epoch >= self._end:
+                    records += RECORD.pack(epoch, series.resolution, price)
+                    self._end = epoch + series.resolution
+                else:
+                    late.append((epoch, series.resolution, price))
+            epoch += series.resolution
+        inserted = self._insert(late) if late else 0
+        if records:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "ab") as file:
+                file.write(records)
+        return inserted + len(records) // RECORD.size
+
+    def _insert(self, late: list[tuple[int, int, float]]) -> int:
+        """Merge slots before the last stored one that no stored slot overlaps."""
+        nearby = list(
+            self.rows(late[0][0] - MAX_RESOLUTION, late[-1][0] + MAX_RESOLUTION)
+        )
+        epochs = [row[0] for row in nearby]
+        missing = []
+        for row in late:
+            index = bisect_right(epochs, row[0])
+            if index and row[0] < epochs[index - 1] + nearby[index - 1][1]:
+                continue
+            if index < len(epochs) and epochs[index] < row[0] + row[1]:
+                continue
+            missing.append(row)
+        if not missing:
+            return 0
+        merged = sorted([*self.rows(), *missing])
+        with open(f"{self.path}.tmp", "wb") as file:
+            for row in merged:
+                file.write(RECORD.pack(*row))
+        os.replace(f"{self.path}.tmp", self.path)
+        return len(missing)
+
+    def rows(
+        self, start: int | None = None, end: int | None = None
+    ) -> Iterator[tuple[int, int, float]]:
+        """Yield (epoch, resolution, price) of the slots starting within [start, end).
+
+        The file is memory mapped and the first slot found by bisection, so
+        a range costs the same however many years precede it.
+        """
+        if not len(self):
+            return
+        with open(self.path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            count = len(buffer) // RECORD.size
+            low, high = 0, count
+            while start is not None and low < high:
+                middle = (low + high) // 2
+                if RECORD.unpack_from(buffer, middle * RECORD.size)[0] < start:
+                    low = middle + 1
+                else:
+                    high = middle
+            view = memoryview(buffer)[low * RECORD.size : count * RECORD.size]
+            try:
+                for row in RECORD.iter_unpack(view):
+                    if end is not None and row[0] >= end:
+                        break
+                    yield row
+            finally:
+                view.release()
+
+
+def export_csv(
+    source: ColumnarPriceFile, path: str, start: int | None = None, end: int | None = None
+) -> int:
+    """Write a range of a price file as CSV, return the number of rows."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        for epoch, resolution, price in source.rows(start, end):
+            writer.writerow(
+                (
+                    datetime.fromtimestamp(epoch, timezone.utc).isoformat(),
+                    epoch,
+                    resolution,
+                    price,
+                )
+            )
+            count += 1
+    return count
+
+
+def export_parquet(
+    source: ColumnarPriceFile, path: str, start: int | None = None, end: int | None = None
+) -> int:
+    """Write a range of a price file as Parquet, return the number of rows.
+
+    Raises ImportError if pyarrow is not installed.
+    """
+    # optional dependency, only needed for this export
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    epochs, resolutions, prices = [], [], []
+    for epoch, resolution, price in source.rows(start, end):
+        epochs.append(epoch)
+        resolutions.append(resolution)
+        prices.append(price)
+    table = pa.table(
+        {
+            "time": pa.array(epochs, pa.timestamp("s", tz="UTC")),
+            "epoch": pa.array(epochs, pa.int64()),
+            "resolution": pa.array(resolutions, pa.int32()),
+            "price": pa.array(prices, pa.float64()),
+        }
+    )
+    pq.write_table(table, path)
+    return len(epochs)
@@ -12,6 +12,7 @@ from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import (
+    ObjectSelector,
     SelectSelectorConfig,
     SelectSelector,
     SelectOptionDict,
@@ -23,14 +24,29 @@ from homeassistant.helpers.template import Template
 from .const import (
     CONF_API_KEY,
     CONF_ENTITY_NAME,
-    CONF_AREA,
+    CONF_AREAS,
     CONF_TZ,
+    CONF_ARCHIVE_DAYS,
+    CONF_RESOLUTION,
+    CONF_FIXED_ADDER,
+    CONF_VAT,
+    CONF_GRID_FEES,
+    CONF_PERCENTILES,
+    CONF_THRESHOLDS,
+    DEFAULT_ARCHIVE_DAYS,
+    DEFAULT_PERCENTILES,
+    PERCENTILE_CHOICES,
+    DEFAULT_RESOLUTION,
+    RESOLUTION_NATIVE,
+    RESOLUTIONS,
     DOMAIN,
     COMPONENT_TITLE,
     UNIQUE_ID,
     AREA_INFO,
     TZ_INFO,
 )
+from .tariff import GRID_FEE_SCHEMA
+from .thresholds import THRESHOLD_SCHEMA
 
 
 class EntsoeFlowHandler(ConfigFlow, domain=DOMAIN):
@@ -38,7 +54,7 @@ class EntsoeFlowHandler(ConfigFlow, domain=DOMAIN):
 
     def __init__(self):
         """Initialize ENTSO-e ConfigFlow."""
-        self.area = None
+        self.areas = None
         self.timezone = None
         self.api_key = None
         self.name = ""
@@ -61,7 +77,7 @@ class EntsoeFlowHandler(ConfigFlow, domain=DOMAIN):
         already_configured = False
 
         if user_input is not None:
-            self.area = user_input[CONF_AREA]
+            self.areas = user_input[CONF_AREAS]
             self.timezone = user_input[CONF_TZ]
             self.api_key = user_input[CONF_API_KEY]
             self.name = user_input[CONF_ENTITY_NAME]
@@ -76,15 +92,19 @@ class EntsoeFlowHandler(ConfigFlow, domain=DOMAIN):
                 errors["base"] = "already_configured"
                 already_configured = True
 
-            if not already_configured:
+            if not self.areas:
+                errors[CONF_AREAS] = "no_areas"
+            elif not already_configured:
                 return self.async_create_entry(
                     title=self.name,
                     data={},
                     options={
                         CONF_API_KEY: user_input[CONF_API_KEY],
-                        CONF_AREA: user_input[CONF_AREA],
+                        CONF_AREAS: user_input[CONF_AREAS],
                         CONF_TZ: user_input[CONF_TZ],
                         CONF_ENTITY_NAME: user_input[CONF_ENTITY_NAME],
+                        CONF_ARCHIVE_DAYS: user_input[CONF_ARCHIVE_DAYS],
+                        CONF_RESOLUTION: user_input[CONF_RESOLUTION],
                     },
                 )
 
@@ -97,12 +117,13 @@ class EntsoeFlowHandler(ConfigFlow, domain=DOMAIN):
                         vol.Coerce(str)
                     ),
                     vol.Required(CONF_API_KEY): vol.All(vol.Coerce(str)),
-                    vol.Required(CONF_AREA): SelectSelector(
+                    vol.Required(CONF_AREAS): SelectSelector(
                         SelectSelectorConfig(
                             options=[
                                 SelectOptionDict(value=country, label=info["name"])
                                 for country, info in AREA_INFO.items()
-                            ]
+                            ],
+                            multiple=True,
                         ),
                     ),
                     vol.Required(CONF_TZ): SelectSelector(
@@ -113,6 +134,102 @@ class EntsoeFlowHandler(ConfigFlow, domain=DOMAIN):
                             ]
                         ),
                     ),
+                    vol.Optional(
+                        CONF_ARCHIVE_DAYS, default=DEFAULT_ARCHIVE_DAYS
+                    ): vol.All(vol.Coerce(int), vol.Range(min=2, max=366)),
+                    vol.Optional(
+                        CONF_RESOLUTION, default=DEFAULT_RESOLUTION
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=[
+                                *RESOLUTIONS,
+                                RESOLUTION_NATIVE,
+                            ],
+                            translation_key=CONF_RESOLUTION,
+                        ),
+                    ),
                 },
             ),
         )
+
+
+class EntsoeOptionFlowHandler(OptionsFlow):
+    """Handle the tariff options of an ENTSO-e entry."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the tariff, statistics percentiles and price thresholds."""
+        errors = {}
+        options = self.config_entry.options
+
+        if user_input is not None:
+            try:
+                GRID_FEE_SCHEMA(user_input.get(CONF_GRID_FEES) or [])
+            except vol.Invalid:
+                errors[CONF_GRID_FEES] = "invalid_grid_fees"
+            try:
+                THRESHOLD_SCHEMA(user_input.get(CONF_THRESHOLDS) or [])
+            except vol.Invalid:
+                errors[CONF_THRESHOLDS] = "invalid_thresholds"
+            try:
+                percentiles = sorted(
+                    {int(percent) for percent in user_input.get(CONF_PERCENTILES, [])}
+                )
+            except ValueError:
+                percentiles = [0]
+            if any(not 0 < percent < 100 for percent in percentiles):
+                errors[CONF_PERCENTILES] = "invalid_percentiles"
+            if not errors:
+                # the other options of the entry are kept as they are
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **options,
+                        CONF_FIXED_ADDER: user_input[CONF_FIXED_ADDER],
+                        CONF_VAT: user_input[CONF_VAT],
+                        CONF_GRID_FEES: user_input.get(CONF_GRID_FEES) or [],
+                        CONF_PERCENTILES: percentiles,
+                        CONF_THRESHOLDS: user_input.get(CONF_THRESHOLDS) or [],
+                    },
+                )
+
+        return self.async_show_form(
+            step_id="init",
+            errors=errors,
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_FIXED_ADDER, default=options.get(CONF_FIXED_ADDER, 0.0)
+                    ): vol.Coerce(float),
+                    vol.Optional(
+                        CONF_VAT, default=options.get(CONF_VAT, 0.0)
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                    vol.Optional(
+                        CONF_GRID_FEES, default=options.get(CONF_GRID_FEES, [])
+                    ): ObjectSelector(),
+                    vol.Optional(
+                        CONF_PERCENTILES,
+                        default=[
+                            str(percent)
+                            for percent in options.get(
+                                CONF_PERCENTILES, DEFAULT_PERCENTILES
+                            )
+                        ],
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=[str(percent) for percent in PERCENTILE_CHOICES],
+                            multiple=True,
+                            custom_value=True,
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_THRESHOLDS, default=options.get(CONF_THRESHOLDS, [])
+                    ): ObjectSelector(),
+                }
+            ),
+        )
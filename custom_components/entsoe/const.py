@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from collections.abc import Callable
+from datetime import time, timedelta
 
 from homeassistant.components.sensor import (
     SensorEntityDescription,
@@ -10,10 +11,13 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.const import (
     CURRENCY_EURO,
-    ENERGY_KILO_WATT_HOUR,
     PERCENTAGE,
+    UnitOfEnergy,
+    UnitOfTime,
 )
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt
 
 ATTRIBUTION = "Data provided by ENTSO-e Transparency Platform"
 DOMAIN = "entsoe"
@@ -24,8 +28,91 @@ COMPONENT_TITLE = "ENTSO-e Transparency Platform - Day-ahead Prices"
 CONF_API_KEY = "api_key"
 CONF_ENTITY_NAME = "name"
 CONF_AREA = "area"
+CONF_AREAS = "areas"
 CONF_TZ = "timezone"
+CONF_ARCHIVE_DAYS = "archive_days"
+CONF_RESOLUTION = "resolution"
+CONF_FIXED_ADDER = "fixed_adder"
+CONF_VAT = "vat"
+CONF_GRID_FEES = "grid_fees"
+CONF_PERCENTILES = "percentiles"
+CONF_THRESHOLDS = "thresholds"
 CONF_COORDINATOR = "coordinator"
+CONF_HUBS = "hubs"
+CONF_LIMITER = "limiter"
+
+# dispatched with the zone code whenever a coordinator publishes its data
+SIGNAL_PRICES_UPDATED = f"{DOMAIN}_prices_updated_{{}}"
+
+API_URL = "https://web-api.tp.entsoe.eu/api"
+API_TIMEOUT = 30
+API_CHUNK_SIZE = 16384
+
+# Market time units, "native" keeps whatever ENTSO-e publishes for the zone
+RESOLUTION_NATIVE = "native"
+RESOLUTIONS = {"PT15M": 900, "PT60M": 3600}
+DEFAULT_RESOLUTION = "PT60M"
+
+# Prices are exposed in €-cent/kWh
+PRICE_UNIT = f"c/{UnitOfEnergy.KILO_WATT_HOUR}"
+
+# Sensor attributes holding the full price list, and the coordinator data they come from
+PRICE_ATTRIBUTES = {
+    "prices_today": "dataToday",
+    "prices_tomorrow": "dataTomorrow",
+    "final_prices_today": "finalToday",
+    "final_prices_tomorrow": "finalTomorrow",
+}
+
+# Weekdays of the grid fee rules, in datetime.weekday() order
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Percentiles of the daily price statistics, offered in the options flow
+DEFAULT_PERCENTILES = (10, 90)
+PERCENTILE_CHOICES = (5, 10, 25, 75, 90, 95)
+
+# Block lengths, in hours, for which the cheapest start is indexed
+WINDOW_HOURS = (1, 2, 3, 4)
+
+# ENTSO-e allows 400 requests per minute per API key; all requests of the domain
+# share a token bucket refilling at a share of that, with a small burst
+REQUEST_BUDGET = 400
+REQUEST_BUDGET_PERIOD = 60
+REQUEST_BUDGET_SHARE = 0.5
+REQUEST_BURST = 10
+
+# Transient failures in a row after which requests for a zone are paused
+BREAKER_THRESHOLD = 3
+LIMITER_SAVE_DELAY = 10
+
+# Backfilling history: days per request and parallel requests
+BACKFILL_CHUNK_DAYS = 31
+BACKFILL_CONCURRENCY = 4
+
+STORAGE_VERSION = 1
+DEFAULT_ARCHIVE_DAYS = 7
+ARCHIVE_SAVE_DELAY = 30
+
+# Upper bounds, in seconds, of the latency histogram buckets and days of API call counts kept
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_DAYS = 7
+
+# Zones of one config entry fetched in parallel
+FETCH_CONCURRENCY = 4
+
+# Entries refreshing within this time of each other share one ENTSO-e request,
+# entries of the same zone are scheduled to poll at the same time to make use of it
+HUB_CACHE_TTL = timedelta(seconds=60)
+
+# Day-ahead auction results are published around 12:45-13:00 CET
+PUBLICATION_TZ = "Europe/Brussels"
+PUBLICATION_START = time(12, 45)
+PUBLICATION_EXPECTED = time(13, 0)
+POLL_MIN_INTERVAL = timedelta(minutes=2)
+POLL_MAX_INTERVAL = timedelta(minutes=30)
+POLL_JITTER = 0.2
+RETRY_MIN_INTERVAL = timedelta(minutes=2)
+RETRY_MAX_INTERVAL = timedelta(hours=1)
 
 # Commented ones are not working at entsoe
 AREA_INFO = {
@@ -85,6 +172,50 @@ AREA_INFO = {
     #  "UA":{"code":"UA", "name":"Ukraine", "Currency":"EUR"},
 }
 
+# EIC codes of the bidding zones, as used by the ENTSO-e API
+AREA_EIC = {
+    "FI": "10YFI-1--------U",
+    "AT": "10YAT-APG------L",
+    "BE": "10YBE----------2",
+    "BG": "10YCA-BULGARIA-R",
+    "HR": "10YHR-HEP------M",
+    "CZ": "10YCZ-CEPS-----N",
+    "DK_1": "10YDK-1--------W",
+    "DK_2": "10YDK-2--------M",
+    "EE": "10Y1001A1001A39I",
+    "FR": "10YFR-RTE------C",
+    "DE_LU": "10Y1001A1001A82H",
+    "GR": "10YGR-HTSO-----Y",
+    "HU": "10YHU-MAVIR----U",
+    "IT_CNOR": "10Y1001A1001A70O",
+    "IT_CSUD": "10Y1001A1001A71M",
+    "IT_NORD": "10Y1001A1001A73I",
+    "IT_SUD": "10Y1001A1001A788",
+    "IT_SICI": "10Y1001A1001A75E",
+    "IT_SARD": "10Y1001A1001A74G",
+    "IT_CALA": "10Y1001C--00096J",
+    "LV": "10YLV-1001A00074",
+    "LT": "10YLT-1001A0008Q",
+    "NL": "10YNL----------L",
+    "NO_1": "10YNO-1--------2",
+    "NO_2": "10YNO-2--------T",
+    "NO_3": "10YNO-3--------J",
+    "NO_4": "10YNO-4--------9",
+    "NO_5": "10Y1001A1001A48H",
+    "PL": "10YPL-AREA-----S",
+    "PT": "10YPT-REN------W",
+    "RO": "10YRO-TEL------P",
+    "RS": "10YCS-SERBIATSOV",
+    "SK": "10YSK-SEPS-----K",
+    "SI": "10YSI-ELES-----O",
+    "ES": "10YES-REE------0",
+    "SE_1": "10Y1001A1001A44P",
+    "SE_2": "10Y1001A1001A45N",
+    "SE_3": "10Y1001A1001A46L",
+    "SE_4": "10Y1001A1001A47J",
+    "CH": "10YCH-SWISSGRIDZ",
+}
+
 TZ_INFO = {
     "FI": {"code": "FI", "timezone": "Europe/Helsinki"},
     "AT": {"code": "AT", "timezone": "Europe/Vienna"},
@@ -121,6 +252,8 @@ class EntsoeEntityDescription(SensorEntityDescription):
     """Describes ENTSO-e sensor entity."""
 
     value_fn: Callable[[dict], StateType] = None
+    # only created for entries with a tariff configured
+    tariff: bool = False
 
 
 SENSOR_TYPES: tuple[EntsoeEntityDescription, ...] = (
@@ -136,4 +269,168 @@ SENSOR_TYPES: tuple[EntsoeEntityDescription, ...] = (
         device_class=SensorDeviceClass.TIMESTAMP,
         value_fn=lambda data: data["time_tomorrow"],
     ),
+    EntsoeEntityDescription(
+        key="current_price",
+        name="Current Price",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement=PRICE_UNIT,
+        value_fn=lambda data: data["index"].current_price(),
+    ),
+    EntsoeEntityDescription(
+        key="next_price",
+        name="Next Price",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement=PRICE_UNIT,
+        value_fn=lambda data: data["index"].next_price(),
+    ),
+    EntsoeEntityDescription(
+        key="final_prices_today",
+        name="Final Prices Today",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        tariff=True,
+        value_fn=lambda data: data["time_today"],
+    ),
+    EntsoeEntityDescription(
+        key="final_prices_tomorrow",
+        name="Final Prices Tomorrow",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        tariff=True,
+        value_fn=lambda data: data["time_tomorrow"],
+    ),
+    EntsoeEntityDescription(
+        key="current_final_price",
+        name="Current Final Price",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement=PRICE_UNIT,
+        tariff=True,
+        value_fn=lambda data: data["final"].price_at(dt.utcnow()),
+    ),
+    EntsoeEntityDescription(
+        key="next_final_price",
+        name="Next Final Price",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement=PRICE_UNIT,
+        tariff=True,
+        value_fn=lambda data: data["final"].price_at(
+            dt.utcnow() + timedelta(seconds=data["final"].resolution)
+        ),
+    ),
+    EntsoeEntityDescription(
+        key="current_rank",
+        name="Current Rank",
+        icon="mdi:sort-numeric-ascending",
+        value_fn=lambda data: data["index"].rank(),
+    ),
+    *(
+        EntsoeEntityDescription(
+            key=f"cheapest_{hours}h_start",
+            name=f"Cheapest {hours}h Start",
+            device_class=SensorDeviceClass.TIMESTAMP,
+            value_fn=lambda data, hours=hours: data["index"].cheapest_start(hours),
+        )
+        for hours in WINDOW_HOURS
+    ),
+    # Diagnostic sensors, disabled by default
+    EntsoeEntityDescription(
+        key="fetch_latency",
+        name="Fetch Latency",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda data: None
+        if data["fetch_metrics"].latency.last is None
+        else round(data["fetch_metrics"].latency.last * 1000, 1),
+    ),
+    EntsoeEntityDescription(
+        key="api_calls_today",
+        name="API Calls Today",
+        icon="mdi:counter",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda data: data["fetch_metrics"].calls_today,
+    ),
+    EntsoeEntityDescription(
+        key="cache_hit_ratio",
+        name="Cache Hit Ratio",
+        icon="mdi:database-check",
+        native_unit_of_measurement=PERCENTAGE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda data: data["fetch_metrics"].cache_hit_ratio,
+    ),
+    EntsoeEntityDescription(
+        key="last_update_success",
+        name="Last Successful Update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda data: data["metrics"].last_success,
+    ),
+    EntsoeEntityDescription(
+        key="last_update_failure",
+        name="Last Failed Update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda data: data["metrics"].last_failure,
+    ),
+    EntsoeEntityDescription(
+        key="data_until",
+        name="Prices Known Until",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda data: data["metrics"].data_until,
+    ),
 )
+
+
+# Fields of the daily statistics exposed as sensors: (field, name, device class)
+STATS_FIELDS = (
+    ("mean", "Average Price", SensorDeviceClass.MONETARY),
+    ("median", "Median Price", SensorDeviceClass.MONETARY),
+    ("min", "Lowest Price", SensorDeviceClass.MONETARY),
+    ("max", "Highest Price", SensorDeviceClass.MONETARY),
+    ("std", "Price Standard Deviation", None),
+    ("min_time", "Lowest Price Time", SensorDeviceClass.TIMESTAMP),
+    ("max_time", "Highest Price Time", SensorDeviceClass.TIMESTAMP),
+)
+
+
+def stats_descriptions(
+    percentiles: tuple[int, ...]
+) -> tuple[EntsoeEntityDescription, ...]:
+    """Return the daily statistics sensors of today and tomorrow, disabled by default."""
+    descriptions = []
+    for day in ("today", "tomorrow"):
+        for field, name, device_class in STATS_FIELDS:
+            descriptions.append(
+                EntsoeEntityDescription(
+                    key=f"{field}_{day}",
+                    name=f"{name} {day.capitalize()}",
+                    device_class=device_class,
+                    native_unit_of_measurement=None
+                    if device_class == SensorDeviceClass.TIMESTAMP
+                    else PRICE_UNIT,
+                    icon="mdi:chart-bell-curve" if device_class is None else None,
+                    entity_registry_enabled_default=False,
+                    value_fn=lambda data, key=f"stats_{day}", field=field: getattr(
+                        data[key], field
+                    ),
+                )
+            )
+        for percent in percentiles:
+            descriptions.append(
+                EntsoeEntityDescription(
+                    key=f"p{percent}_{day}",
+                    name=f"{percent}th Percentile Price {day.capitalize()}",
+                    device_class=SensorDeviceClass.MONETARY,
+                    native_unit_of_measurement=PRICE_UNIT,
+                    entity_registry_enabled_default=False,
+                    value_fn=lambda data, key=f"stats_{day}", percent=percent: data[
+                        key
+                    ].percentiles.get(percent),
+                )
+            )
+    return tuple(descriptions)
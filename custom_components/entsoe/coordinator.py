@@ -1,42 +1,91 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Mapping
 from datetime import timedelta
+from time import perf_counter
+from types import MappingProxyType
+from typing import Any
 from multiprocessing import AuthenticationError
 from aiohttp import ClientError
-import pandas as pd
-from entsoe import EntsoePandasClient
-from entsoe.exceptions import NoMatchingDataError
-from requests.exceptions import HTTPError
 
 import logging
 
 from datetime import datetime
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HassJob, HomeAssistant, callback
+from homeassistant.helpers import event
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.template import Template, attach
-from jinja2 import pass_context
 
 from .const import (
     AREA_INFO,
+    CONF_COORDINATOR,
+    DEFAULT_PERCENTILES,
+    DOMAIN,
+    FETCH_CONCURRENCY,
+    RESOLUTIONS,
+    SIGNAL_PRICES_UPDATED,
     TZ_INFO,
+    WINDOW_HOURS,
+)
+from .client import EntsoeAuthError
+from .hub import EntsoeHub
+from .metrics import UpdateMetrics
+from .price_index import PriceIndex
+from .scheduler import market_day_end, next_refresh
+from .series import DayPartition, PriceSeries, local_midnight
+from .stats import day_stats
+from .tariff import Tariff
+from .thresholds import (
+    ATTR_ABOVE,
+    ATTR_BELOW,
+    ATTR_FINAL,
+    price_transitions,
+    threshold_key,
 )
 
 
 class EntsoeCoordinator(DataUpdateCoordinator):
-    """Get the latest data and update the states."""
+    """Get the latest data and update the states.
+
+    One coordinator serves every bidding zone of a config entry. The zones are
+    fetched concurrently through their hubs and published as one snapshot,
+    keyed by zone code, so all entities of the entry refresh in one cycle.
+    """
 
-    def __init__(self, hass: HomeAssistant, api_key, area, timezone) -> None:
-        """Initialize the data object."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        hubs: dict[str, EntsoeHub],
+        timezone,
+        resolution=None,
+        tariff: Tariff | None = None,
+        percentiles: tuple[int, ...] = DEFAULT_PERCENTILES,
+        thresholds: list[dict] | None = None,
+    ) -> None:
+        """Initialize the data object for the hubs of the entry's zones."""
         self.hass = hass
-        self.api_key = api_key
-        self.area = AREA_INFO[area]["code"]
+        self.hubs = hubs
+        self.areas = list(hubs)
         self.timezone = TZ_INFO[timezone]["timezone"]
+        self.tzinfo = dt.get_time_zone(self.timezone)
+        # None keeps the resolution ENTSO-e publishes, otherwise aggregate to it
+        self.resolution = RESOLUTIONS.get(resolution)
+        self.tariff = tariff
+        self.percentiles = tuple(sorted(percentiles))
+        self.thresholds = thresholds or []
+        self._failures = 0
+        self._tick_job = HassJob(self._handle_tick)
+        self._unsub_tick = None
+        self._processed = {}
+        self._processed_for = None
+        self.metrics = UpdateMetrics()
 
         logger = logging.getLogger(__name__)
+        # the interval is recomputed after every refresh by schedule_next_refresh
         super().__init__(
             hass,
             logger,
@@ -47,122 +96,282 @@ class EntsoeCoordinator(DataUpdateCoordinator):
     async def _async_update_data(self) -> dict:
         """Get the latest data from ENTSO-e"""
         self.logger.debug("Fetching ENTSO-e data")
-        self.logger.debug(f"Bidding zone: {self.area}")
+        self.logger.debug(f"Bidding zones: {', '.join(self.areas)}")
         self.logger.debug(f"Timezone:  {self.timezone}")
 
-        tz = self.timezone
-
-        start_today = pd.Timestamp.now(tz).floor("1D")
-        end_today = pd.Timestamp.now(tz).ceil(freq="1D") - pd.Timedelta(seconds=1)
-        start_tomorrow = (pd.Timestamp.now(tz) + pd.DateOffset(days=1)).floor("1D")
-        end_tomorrow = (pd.Timestamp.now(tz) + pd.DateOffset(days=1)).ceil(
-            freq="1D"
-        ) - pd.Timedelta(seconds=1)
-
-        data = await self.fetch_prices(start_today, end_tomorrow)
-
-        if data is not None:
-            # entsoe-py returns timestamps in server timezone
-            # converting the data series to requested tz just in case these differ
-            data = data.reindex(data.index.tz_convert(tz))
-
-            # todo: refactor, only handle pandas.Timestamps within this class, since
-            # pandas.Timestamp seems generally buggy, HomeAssistant doesn't support it and
-            # timestamps anyway converted to string in dict that is put in the extra attributes
-            # of the sensor entity.
-            # also read https://github.com/EnergieID/entsoe-py/issues/187 and quickfix #202
-
-            # convert all prices (in pd.Series) from €/MWh to €-cent/kWh = divide by 10.0
-            data = round(( data / 10.0 ), 3)
-
-            # using .loc[] to slice today and tomorrow
-            # .loc[] throws KeyError if missing so we need to catch this silently
-            try:
-                dataToday = data.loc[start_today.strftime("%Y-%m-%d")].to_dict()
-            except KeyError as kerr:
-                dataToday = {}
-            try:
-                # only return a full set of 23 or more items(hours) for 'tomorrow'
-                dataTomorrow = (
-                    data.loc[start_tomorrow.strftime("%Y-%m-%d")].to_dict()
-                    if data.loc[start_tomorrow.strftime("%Y-%m-%d")].size >= 23
-                    else {}
-                )
-            except KeyError as kerr:
-                dataTomorrow = {}
+        begin = perf_counter()
+        try:
+            fetched = await self.fetch_prices()
+        except UpdateFailed:
+            self.metrics.update_time.observe(perf_counter() - begin)
+            self.schedule_next_refresh(self.data)
+            raise
 
-            return {
-                "data": data.to_dict(),
-                "dataToday": dataToday,
-                "dataTomorrow": dataTomorrow,
-            }
-        elif self.data is not None:
-            # Note to self: we never come here since fetch_prices already throws if data is None
+        result = {}
+        for area, data in fetched.items():
+            if data is not None:
+                # convert all prices from €/MWh to €-cent/kWh = divide by 10.0
+                data = data.scaled(0.1, 3)
+                if self.resolution is not None:
+                    data = data.mean_by(self.resolution)
+                result[area] = self.split_days(data)
+            elif self.data is not None and area in self.data:
+                # degraded mode, keep serving the stored prices of the zone
+                result[area] = self.data[area]
+        result = result or None
 
-            return {
-                "data": self.data["data"],
-                "dataToday": self.data["dataToday"],
-                "dataTomorrow": self.data["dataTomorrow"],
-            }
+        if result is not None:
+            self.metrics.data_until = dt.utc_from_timestamp(
+                min(zone["data"].end for zone in result.values())
+            )
+        self.metrics.update_time.observe(perf_counter() - begin)
+        self.schedule_next_refresh(result)
+        return result
 
-    async def fetch_prices(self, start_date, end_date):
-        try:
-            # run api_update in async job
-            resp = await self.hass.async_add_executor_job(
-                self.api_update, start_date, end_date, self.api_key
+    def split_days(self, data: PriceSeries) -> dict:
+        """Slice the price series into today and tomorrow in the entry's timezone."""
+        today = dt.now(self.tzinfo).date()
+        tomorrow = today + timedelta(days=1)
+        partition = DayPartition(data, self.tzinfo)
+
+        dataToday = partition.day(today)
+        dataTomorrow = partition.day(tomorrow)
+        # only return 'tomorrow' once all of its 23, 24 or 25 hours are known, as
+        # far as they fall within tomorrow's market day: that is all ENTSO-e
+        # publishes today, so e.g. Lisbon's last hour of tomorrow can't be known
+        complete = partition.complete(
+            tomorrow, int(market_day_end(tomorrow).timestamp())
+        )
+        if not complete:
+            dataTomorrow = PriceSeries(dataTomorrow.start, data.resolution)
+
+        # ranks and cheapest blocks over everything known from today on
+        horizon = data.between(dataToday.start, dataTomorrow.end)
+
+        result = {
+            "data": data,
+            "day": today,
+            "dataToday": dataToday,
+            "dataTomorrow": dataTomorrow,
+            "tomorrowComplete": complete,
+            "index": PriceIndex(horizon, self.tzinfo, WINDOW_HOURS),
+            # statistics are computed once here, sensors only read their fields
+            "statsToday": day_stats(dataToday, self.tzinfo, self.percentiles),
+            "statsTomorrow": day_stats(dataTomorrow, self.tzinfo, self.percentiles),
+        }
+        if self.tariff is not None:
+            # consumer prices over the whole horizon, sliced like the spot prices
+            final = self.tariff.apply(horizon, self.tzinfo)
+            result["final"] = final
+            result["finalToday"] = final.between(dataToday.start, dataToday.end)
+            result["finalTomorrow"] = final.between(
+                dataTomorrow.start, dataTomorrow.end
+            )
+        # threshold states over the horizon, as the exact times they flip
+        result["transitions"] = {
+            threshold_key(rule): price_transitions(
+                result["final"] if rule[ATTR_FINAL] and "final" in result else horizon,
+                below=rule.get(ATTR_BELOW),
+                above=rule.get(ATTR_ABOVE),
             )
+            for rule in self.thresholds
+        }
+        return result
+
+    def schedule_next_refresh(self, data) -> None:
+        """Set the update interval so the next refresh follows the auction publication."""
+        now = dt.utcnow()
+        tomorrow_complete = (
+            data is not None
+            and len(data) == len(self.areas)
+            and all(zone["tomorrowComplete"] for zone in data.values())
+        )
+        next_update = next_refresh(now, tomorrow_complete, self._failures)
+        # entries sharing a zone poll together, so the hub fetches once for all
+        next_update = min(hub.next_poll(next_update) for hub in self.hubs.values())
+        self.update_interval = next_update - now
+        self.logger.debug(
+            f"Next ENTSO-e refresh for {', '.join(self.areas)} at {next_update}"
+        )
+
+        self.schedule_tick(data)
+
+    def schedule_tick(self, data) -> None:
+        """Arm the clock for the next market time unit boundary.
+
+        One clock per coordinator drives all of its entities, instead of
+        every entity keeping its own timer for the top of the hour.
+        """
+        if self._unsub_tick:
+            self._unsub_tick()
+        resolution = (
+            min(zone["data"].resolution for zone in data.values())
+            if data is not None
+            else 3600
+        )
+        now = int(dt.utcnow().timestamp())
+        self._unsub_tick = event.async_track_point_in_utc_time(
+            self.hass,
+            self._tick_job,
+            dt.utc_from_timestamp(now - now % resolution + resolution),
+        )
+
+    @callback
+    def _handle_tick(self, _now: datetime) -> None:
+        """Notify all entities of a new slot, re-slicing the days at local midnight."""
+        self._unsub_tick = None
+        if self.data is None:
+            self.schedule_tick(None)
+            return
+        today = dt.now(self.tzinfo).date()
+        if any(zone["day"] != today for zone in self.data.values()):
+            # prices of tomorrow become today's at local midnight, no fetch needed for that
+            data = {
+                area: self.split_days(zone["data"]) for area, zone in self.data.items()
+            }
+            self.schedule_next_refresh(data)
+            self.async_set_updated_data(data)
+        else:
+            self.schedule_tick(self.data)
+            self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the entities, and the websocket subscribers of each zone."""
+        super().async_update_listeners()
+        for area in self.areas:
+            async_dispatcher_send(self.hass, SIGNAL_PRICES_UPDATED.format(area))
+
+    async def async_shutdown(self) -> None:
+        """Stop the clock and cancel any pending refresh."""
+        if self._unsub_tick:
+            self._unsub_tick()
+            self._unsub_tick = None
+        await super().async_shutdown()
+
+    async def fetch_prices(self) -> dict[str, PriceSeries | None]:
+        """Fetch all zones concurrently, each zone failing on its own."""
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
 
-            return resp
+        async def fetch(area):
+            async with semaphore:
+                # the hub fetches once for all entries of the zone
+                return await self.hubs[area].async_get_prices()
 
-        except HTTPError as exc:
-            if exc.response.status_code == 401:
+        results = await asyncio.gather(
+            *(fetch(area) for area in self.areas), return_exceptions=True
+        )
+
+        fetched = {}
+        failed = False
+        for area, resp in zip(self.areas, results):
+            if not isinstance(resp, Exception):
+                fetched[area] = resp
+                continue
+            exc = resp
+            failed = True
+            self.metrics.record_failure(exc)
+            if isinstance(exc, EntsoeAuthError):
+                self._failures += 1
                 raise UpdateFailed("Unauthorized: Please check your API-key.") from exc
-        except Exception as exc:
-            if self.data is not None:
-                newest_timestamp = pd.Timestamp(list(self.data["data"])[-1])
-                if (newest_timestamp) > pd.Timestamp.now(newest_timestamp.tzinfo):
+            fetched[area] = None
+            if self.data is not None and area in self.data:
+                if self.data[area]["data"].end > dt.utcnow().timestamp():
                     self.logger.warning(
-                        f"Warning the integration is running in degraded mode (falling back on stored data) since fetching the latest ENTSOE-e prices failed with exception: {exc}."
+                        f"Warning the integration is running in degraded mode for {area} (falling back on stored data) since fetching the latest ENTSOE-e prices failed with exception: {exc}."
                     )
                 else:
                     self.logger.error(
-                        f"Error the latest available data is older than the current time. Therefore entities will no longer update. {exc}"
+                        f"Error the latest available data for {area} is older than the current time. Therefore its entities will no longer update. {exc}"
                     )
-                    raise UpdateFailed(
-                        f"Unexpected error when fetching ENTSO-e prices: {exc}"
-                    ) from exc
+            elif self.data is None:
+                self.logger.warning(
+                    f"Warning the integration doesn't have any up to date local data for {area} this means that entities won't get updated but access remains to restorable entities: {exc}."
+                )
             else:
                 self.logger.warning(
-                    f"Warning the integration doesn't have any up to date local data this means that entities won't get updated but access remains to restorable entities: {exc}."
+                    f"Warning the integration has no data for {area} since fetching the ENTSO-e prices failed with exception: {exc}."
                 )
 
-    def api_update(self, start_date, end_date, api_key):
-        client = EntsoePandasClient(api_key=api_key)
-        return client.query_day_ahead_prices(
-            country_code=self.area, start=start_date, end=end_date
-        )
+        if failed:
+            self._failures += 1
+            # the first refresh goes on without data, so the entities restore
+            # their last state; later ones fail once the stored data ran out
+            usable = self.data is None or any(
+                area in self.data
+                and self.data[area]["data"].end > dt.utcnow().timestamp()
+                for area in self.areas
+            )
+            if not usable and all(data is None for data in fetched.values()):
+                raise UpdateFailed(
+                    f"Unexpected error when fetching ENTSO-e prices for {', '.join(self.areas)}"
+                )
+        else:
+            self._failures = 0
+            self.metrics.record_success()
+        return fetched
 
-    def processed_data(self):
-        return {
-            "prices_today": self.get_timestamped_prices(self.data["dataToday"]),
-            "prices_tomorrow": self.get_timestamped_prices(self.data["dataTomorrow"]),
-            "time_today": self.get_today(),
-            "time_tomorrow": self.get_tomorrow(),
-        }
+    def processed_data(self, area: str) -> Mapping[str, Any]:
+        """Return the view the entities of a zone read from, built once per data refresh.
 
-    def get_timestamped_prices(self, hourprices):
-        list = []
-        for hour, price in hourprices.items():
-            str_hour = str(hour)
-            list.append({"time": str_hour, "price": price})
-        return list
-
-    def get_today(self):
-        return pd.Timestamp.now(self.timezone).floor("1D").to_pydatetime()
-
-    def get_tomorrow(self):
-        return (
-            (pd.Timestamp.now(self.timezone) + pd.DateOffset(days=1))
-            .floor("1D")
-            .to_pydatetime()
+        self.data is replaced on every refresh and at the local day rollover,
+        so the snapshot is rebuilt exactly then and shared by all entities.
+        """
+        if self._processed_for is not self.data:
+            self._processed = {}
+            self._processed_for = self.data
+        if area not in self._processed:
+            zone = self.data[area]
+            processed = {
+                "prices_today": self.get_timestamped_prices(zone["dataToday"]),
+                "prices_tomorrow": self.get_timestamped_prices(
+                    zone["dataTomorrow"]
+                ),
+                "time_today": local_midnight(zone["day"], self.tzinfo),
+                "time_tomorrow": local_midnight(
+                    zone["day"] + timedelta(days=1), self.tzinfo
+                ),
+                "index": zone["index"],
+                "stats_today": zone["statsToday"],
+                "stats_tomorrow": zone["statsTomorrow"],
+                # live objects, so diagnostic sensors read current values
+                "metrics": self.metrics,
+                "fetch_metrics": self.hubs[area].metrics,
+            }
+            if "final" in zone:
+                processed["final"] = zone["final"]
+                processed["final_prices_today"] = self.get_timestamped_prices(
+                    zone["finalToday"]
+                )
+                processed["final_prices_tomorrow"] = self.get_timestamped_prices(
+                    zone["finalTomorrow"]
+                )
+            self._processed[area] = MappingProxyType(processed)
+        return self._processed[area]
+
+    def get_timestamped_prices(self, hourprices: PriceSeries):
+        return tuple(
+            {"time": str(hour), "price": price}
+            for hour, price in hourprices.items(self.tzinfo)
         )
+
+
+def zone_coordinator(hass: HomeAssistant, zone: str) -> EntsoeCoordinator | None:
+    """Return the coordinator fetching a zone, by AREA_INFO key or zone code."""
+    code = AREA_INFO[zone]["code"] if zone in AREA_INFO else zone
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        if not isinstance(entry_data, dict) or CONF_COORDINATOR not in entry_data:
+            continue
+        coordinator = entry_data[CONF_COORDINATOR]
+        if code in coordinator.hubs:
+            return coordinator
+    return None
+
+
+def zone_data(hass: HomeAssistant, zone: str) -> dict | None:
+    """Return the coordinator data of a zone, by AREA_INFO key or zone code."""
+    code = AREA_INFO[zone]["code"] if zone in AREA_INFO else zone
+    coordinator = zone_coordinator(hass, zone)
+    if coordinator is None or coordinator.data is None:
+        return None
+    return coordinator.data.get(code)
@@ -0,0 +1,60 @@
+"""Diagnostics support for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from .const import CONF_API_KEY, CONF_COORDINATOR, DOMAIN
+from .coordinator import EntsoeCoordinator
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: EntsoeCoordinator = hass.data[DOMAIN][entry.entry_id][
+        CONF_COORDINATOR
+    ]
+    data = coordinator.data or {}
+
+    return {
+        "options": async_redact_data(entry.options, TO_REDACT),
+        "coordinator": {
+            "areas": coordinator.areas,
+            "timezone": coordinator.timezone,
+            "resolution": coordinator.resolution,
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval,
+            "failures": coordinator._failures,
+            "metrics": coordinator.metrics.as_dict(),
+        },
+        "zones": {
+            area: {
+                "hub": {
+                    "subscribers": hub.refs,
+                    "fetched_at": hub._fetched_at,
+                    "archive_resolution": hub.archive.resolution,
+                    "archived_prices": len(hub.archive._prices),
+                    "metrics": hub.metrics.as_dict(),
+                },
+                "data": None
+                if area not in data
+                else {
+                    key: {
+                        "start": dt.utc_from_timestamp(data[area][key].start),
+                        "resolution": data[area][key].resolution,
+                        "slots": len(data[area][key]),
+                        "prices": data[area][key].count(),
+                    }
+                    for key in ("data", "dataToday", "dataTomorrow")
+                },
+            }
+            for area, hub in coordinator.hubs.items()
+        },
+    }
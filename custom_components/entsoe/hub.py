@@ -0,0 +1,247 @@
+"""Shared per-bidding-zone fetching for the ENTSO-e prices component."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import logging
+
+from datetime import datetime, timedelta
+from functools import partial
+from time import perf_counter
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt
+
+from .archive import PriceArchive
+from .client import EntsoeAuthError, EntsoeCircuitOpenError, EntsoeClient
+from .columnar import ColumnarPriceFile, price_file_path
+from .const import (
+    AREA_INFO,
+    CONF_HUBS,
+    DOMAIN,
+    HUB_CACHE_TTL,
+    TZ_INFO,
+)
+from .limiter import EntsoeLimiter, async_get_limiter
+from .metrics import FetchMetrics
+from .scheduler import market_day_end
+from .series import PriceSeries, local_midnight
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EntsoeHub:
+    """Fetch the prices of one bidding zone once for all subscribed entries.
+
+    Every config entry using the same bidding zone (e.g. "DE" and "LU" both map
+    to "DE_LU") subscribes with its own timezone. The hub queries a window that
+    covers today and tomorrow in each of those timezones, so a single request
+    serves all of them and each coordinator only slices out its own days.
+    Fetched prices go to a persistent archive, so only the ranges it is
+    missing are requested from ENTSO-e. Every price is also appended to the
+    zone's columnar price file, which, unlike the archive, is never pruned.
+
+    The entries also poll the zone together: their refreshes are jittered
+    further apart than the cache lasts, so each entry joins the earliest poll
+    already scheduled for the zone instead of keeping its own.
+
+    Requests use the API key of the entry that subscribed last, so a changed
+    key takes effect when its entry reloads. A key rejected by ENTSO-e, or
+    whose entries are all gone, is replaced by another subscribed one.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, api_key, area, archive_days, limiter: EntsoeLimiter
+    ) -> None:
+        """Initialize the hub for a bidding zone code."""
+        self.hass = hass
+        self.api_key = api_key
+        self.area = area
+        self.client = EntsoeClient(async_get_clientsession(hass), api_key)
+        self.limiter = limiter
+        self._timezones = Counter()
+        self._api_keys = Counter()
+        self._lock = asyncio.Lock()
+        self._fetched_at = None
+        self._next_poll = None
+        self._loaded = False
+        self.archive = PriceArchive(hass, area, archive_days)
+        self.columns = ColumnarPriceFile(price_file_path(hass, area))
+        self.metrics = FetchMetrics()
+
+    @property
+    def refs(self) -> int:
+        """Return the number of subscribed entries."""
+        return sum(self._timezones.values())
+
+    def subscribe(self, timezone, api_key=None) -> None:
+        """Register an entry using the given timezone, and its API key from now on."""
+        self._timezones[timezone] += 1
+        if api_key is not None:
+            self._api_keys[api_key] += 1
+            self._use_api_key(api_key)
+
+    def unsubscribe(self, timezone, api_key=None) -> None:
+        """Unregister an entry using the given timezone and API key."""
+        self._timezones[timezone] -= 1
+        if self._timezones[timezone] <= 0:
+            del self._timezones[timezone]
+        if api_key in self._api_keys:
+            self._api_keys[api_key] -= 1
+            if self._api_keys[api_key] <= 0:
+                del self._api_keys[api_key]
+                if api_key == self.api_key and self._api_keys:
+                    self._use_api_key(next(reversed(self._api_keys)))
+
+    def _use_api_key(self, api_key) -> None:
+        """Send the following requests with an API key."""
+        if api_key != self.api_key:
+            self.api_key = api_key
+            self.client = EntsoeClient(self.client._session, api_key, self.client._url)
+
+    def _replace_rejected_api_key(self) -> None:
+        """Move on to another subscribed API key after ENTSO-e rejected the current one."""
+        others = [api_key for api_key in self._api_keys if api_key != self.api_key]
+        if others:
+            _LOGGER.warning(
+                f"ENTSO-e rejected an API key, {self.area} continues with another entry's key"
+            )
+            self._use_api_key(others[-1])
+
+    def next_poll(self, when: datetime) -> datetime:
+        """Return when an entry wanting to poll at a time should, joining an earlier poll."""
+        if self._next_poll is None or not dt.utcnow() < self._next_poll <= when:
+            self._next_poll = when
+        return self._next_poll
+
+    def window(self):
+        """Return the range covering today and tomorrow in every subscribed timezone.
+
+        Tomorrow is cut at the end of its market day, the part of a western
+        timezone's tomorrow after it is not published yet and would be an
+        archive gap requested on every poll.
+        """
+        starts = []
+        ends = []
+        for name in self._timezones:
+            tz = dt.get_time_zone(name)
+            today = dt.now(tz).date()
+            tomorrow = today + timedelta(days=1)
+            starts.append(local_midnight(today, tz))
+            ends.append(
+                min(
+                    local_midnight(tomorrow + timedelta(days=1), tz),
+                    market_day_end(tomorrow),
+                )
+                - timedelta(seconds=1)
+            )
+        return min(starts), max(ends)
+
+    async def async_load(self) -> None:
+        """Load the archived prices once, before the first fetch."""
+        async with self._lock:
+            if not self._loaded:
+                await self.archive.async_load()
+                # catches up with what was archived while the file couldn't be written
+                await self.async_append_columns(self.archive.full_series())
+                self._loaded = True
+
+    async def async_append_columns(self, data: PriceSeries | None) -> None:
+        """Append prices to the columnar price file, failing without affecting the fetch."""
+        try:
+            added = await self.hass.async_add_executor_job(self.columns.append, data)
+        except OSError as exc:
+            _LOGGER.warning(f"Could not write the price file of {self.area}: {exc}")
+        else:
+            if added:
+                _LOGGER.debug(f"Appended {added} prices to the price file of {self.area}")
+
+    async def async_get_prices(self):
+        """Return the prices of the zone, fetching only what the archive lacks."""
+        async with self._lock:
+            start_date, end_date = self.window()
+            now = dt.utcnow()
+            stale = self._fetched_at is None or now - self._fetched_at >= HUB_CACHE_TTL
+            gaps = self.archive.missing(start_date, end_date) if stale else []
+            if not stale:
+                _LOGGER.debug(f"Using shared ENTSO-e data for {self.area}")
+
+            if gaps:
+                self.metrics.cache_misses += 1
+            else:
+                self.metrics.cache_hits += 1
+            try:
+                for gap_start, gap_end in gaps:
+                    _LOGGER.debug(
+                        f"Fetching ENTSO-e data for {self.area} from {gap_start} to {gap_end}"
+                    )
+                    begin = perf_counter()
+                    sent = True
+                    try:
+                        data = await self.limiter.async_request(
+                            self.area,
+                            partial(
+                                self.client.query_day_ahead_prices,
+                                self.area,
+                                gap_start,
+                                gap_end,
+                            ),
+                        )
+                    except EntsoeCircuitOpenError:
+                        sent = False
+                        self.metrics.requests_avoided += 1
+                        raise
+                    finally:
+                        if sent:
+                            self.metrics.record_request(
+                                perf_counter() - begin,
+                                self.client.last_parse_time,
+                                self.client.last_payload,
+                            )
+                    # None e.g. for tomorrow before the auction results are published
+                    if data is not None:
+                        self.archive.add(data)
+                        await self.async_append_columns(data)
+            except Exception as exc:
+                self.metrics.record_failure(exc)
+                if isinstance(exc, EntsoeAuthError):
+                    self._replace_rejected_api_key()
+                # e.g. tomorrow after a restart while ENTSO-e can't be reached, the
+                # archived prices still serve today; a bad API key is always raised
+                if isinstance(exc, EntsoeAuthError) or not self.archive.covers(now):
+                    raise
+                _LOGGER.warning(
+                    f"Fetching ENTSO-e data for {self.area} failed, serving archived prices: {exc}"
+                )
+                return self.archive.series(start_date, end_date)
+            if stale:
+                self._fetched_at = now
+            self.metrics.record_success()
+
+            return self.archive.series(start_date, end_date)
+
+
+async def async_acquire_hub(
+    hass: HomeAssistant, api_key, area, timezone, archive_days
+) -> EntsoeHub:
+    """Return the shared hub for an area, creating and loading it on first use."""
+    limiter = await async_get_limiter(hass)
+    hubs = hass.data.setdefault(DOMAIN, {}).setdefault(CONF_HUBS, {})
+    code = AREA_INFO[area]["code"]
+    hub = hubs.get(code)
+    if hub is None:
+        hub = hubs[code] = EntsoeHub(hass, api_key, code, archive_days, limiter)
+    hub.archive.days = max(hub.archive.days, archive_days)
+    hub.subscribe(TZ_INFO[timezone]["timezone"], api_key)
+    await hub.async_load()
+    return hub
+
+
+def async_release_hub(
+    hass: HomeAssistant, hub: EntsoeHub, timezone, api_key=None
+) -> None:
+    """Drop a subscription and forget the hub once nobody uses it."""
+    hub.unsubscribe(TZ_INFO[timezone]["timezone"], api_key)
+    if hub.refs == 0:
+        hass.data[DOMAIN][CONF_HUBS].pop(hub.area, None)
@@ -0,0 +1,259 @@
+"""Domain-wide request budget and per-zone circuit breakers for ENTSO-e requests."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+import logging
+from time import monotonic
+from typing import TypeVar
+
+from aiohttp import ClientError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt
+
+from .client import (
+    EntsoeCircuitOpenError,
+    EntsoeRateLimitError,
+    EntsoeUnavailableError,
+)
+from .const import (
+    BREAKER_THRESHOLD,
+    CONF_LIMITER,
+    DOMAIN,
+    LIMITER_SAVE_DELAY,
+    REQUEST_BUDGET,
+    REQUEST_BUDGET_PERIOD,
+    REQUEST_BUDGET_SHARE,
+    REQUEST_BURST,
+    RETRY_MAX_INTERVAL,
+    RETRY_MIN_INTERVAL,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Failures that say nothing about the request itself, but about the API being unreachable
+TRANSIENT_ERRORS = (
+    EntsoeRateLimitError,
+    EntsoeUnavailableError,
+    ClientError,
+    asyncio.TimeoutError,
+)
+
+
+class TokenBucket:
+    """Token bucket spacing requests to a share of ENTSO-e's request budget."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize a full bucket refilling rate tokens per second."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Take a token, waiting for one to be refilled if the bucket is empty."""
+        async with self._lock:
+            while True:
+                now = monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Closed, open or half-open state of the requests for one bidding zone.
+
+    After BREAKER_THRESHOLD transient failures in a row, or at once on HTTP 429
+    with a Retry-After, the breaker opens and no requests are sent until the
+    cooldown has passed. Then a single trial request is let through
+    (half-open), other requests are refused while it is in flight: success
+    closes the breaker, any failure opens it again with twice the cooldown.
+    """
+
+    def __init__(
+        self,
+        state: str = STATE_CLOSED,
+        failures: int = 0,
+        open_until: datetime | None = None,
+        cooldown: float | None = None,
+    ) -> None:
+        """Initialize the breaker, closed unless restored otherwise."""
+        self.state = state
+        self.failures = failures
+        self.open_until = open_until
+        self.cooldown = cooldown
+        # not stored, a restart drops the trial request in flight with it
+        self.trial = False
+
+    def allow(self, now: datetime) -> bool:
+        """Return if a request may be sent, moving from open to half-open when due."""
+        if self.state == STATE_OPEN:
+            if now < self.open_until:
+                return False
+            self.state = STATE_HALF_OPEN
+        if self.state == STATE_HALF_OPEN:
+            if self.trial:
+                return False
+            self.trial = True
+        return True
+
+    def release(self) -> None:
+        """Let another request be the trial, the current one was never answered."""
+        self.trial = False
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.open_until = None
+        self.cooldown = None
+        self.trial = False
+
+    def record_failure(self, now: datetime, retry_after: int | None = None) -> None:
+        """Count a failure, opening the breaker when it is one too many or the trial."""
+        self.trial = False
+        self.failures += 1
+        if (
+            retry_after is None
+            and self.state != STATE_HALF_OPEN
+            and self.failures < BREAKER_THRESHOLD
+        ):
+            return
+        if retry_after is not None:
+            cooldown = float(retry_after)
+        elif self.cooldown is None:
+            cooldown = RETRY_MIN_INTERVAL.total_seconds()
+        else:
+            cooldown = min(self.cooldown * 2, RETRY_MAX_INTERVAL.total_seconds())
+        self.state = STATE_OPEN
+        self.cooldown = cooldown
+        self.open_until = now + timedelta(seconds=cooldown)
+
+    def as_dict(self) -> dict:
+        """Return the stored form."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_until": self.open_until.isoformat() if self.open_until else None,
+            "cooldown": self.cooldown,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CircuitBreaker:
+        """Restore a breaker from its stored form."""
+        open_until = data.get("open_until")
+        return cls(
+            data.get("state", STATE_CLOSED),
+            data.get("failures", 0),
+            datetime.fromisoformat(open_until) if open_until else None,
+            data.get("cooldown"),
+        )
+
+
+class EntsoeLimiter:
+    """Rate limit and circuit breakers shared by every ENTSO-e request of the domain.
+
+    The breakers, including when open ones may be retried, are persisted so a
+    restart during an outage or after a 429 doesn't send requests early.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the limiter."""
+        self.bucket = TokenBucket(
+            REQUEST_BUDGET * REQUEST_BUDGET_SHARE / REQUEST_BUDGET_PERIOD,
+            REQUEST_BURST,
+        )
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.limiter")
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Restore the stored breakers once, callers during the load wait for it."""
+        async with self._lock:
+            if self._loaded:
+                return
+            stored = await self._store.async_load()
+            if stored is not None:
+                self.breakers = {
+                    area: CircuitBreaker.from_dict(breaker)
+                    for area, breaker in stored.get("breakers", {}).items()
+                }
+            self._loaded = True
+
+    def _data_to_save(self) -> dict:
+        return {
+            "breakers": {
+                area: breaker.as_dict()
+                for area, breaker in self.breakers.items()
+                if breaker.state != STATE_CLOSED or breaker.failures
+            }
+        }
+
+    def breaker(self, area: str) -> CircuitBreaker:
+        """Return the breaker of a bidding zone code."""
+        return self.breakers.setdefault(area, CircuitBreaker())
+
+    async def async_request(self, area: str, request: Callable[[], Awaitable[T]]) -> T:
+        """Send a request for a zone through its breaker and the shared budget."""
+        breaker = self.breaker(area)
+        if not breaker.allow(dt.utcnow()):
+            if breaker.state == STATE_HALF_OPEN:
+                raise EntsoeCircuitOpenError(
+                    f"Not requesting {area} from ENTSO-e while a trial request is pending"
+                )
+            raise EntsoeCircuitOpenError(
+                f"Not requesting {area} from ENTSO-e until {breaker.open_until}",
+                breaker.open_until,
+            )
+        state = breaker.state
+        try:
+            await self.bucket.acquire()
+            result = await request()
+        except Exception as exc:
+            # other errors don't count against a closed breaker, but fail the trial
+            if not isinstance(exc, TRANSIENT_ERRORS) and state != STATE_HALF_OPEN:
+                raise
+            breaker.record_failure(dt.utcnow(), getattr(exc, "retry_after", None))
+            if breaker.state == STATE_OPEN:
+                _LOGGER.warning(
+                    f"Pausing ENTSO-e requests for {area} until {breaker.open_until} after: {exc}"
+                )
+            self._store.async_delay_save(self._data_to_save, LIMITER_SAVE_DELAY)
+            raise
+        except BaseException:
+            # cancelled before an answer, which says nothing about the API
+            if state == STATE_HALF_OPEN:
+                breaker.release()
+            raise
+        if state != STATE_CLOSED or breaker.failures:
+            breaker.record_success()
+            self._store.async_delay_save(self._data_to_save, LIMITER_SAVE_DELAY)
+        return result
+
+
+async def async_get_limiter(hass: HomeAssistant) -> EntsoeLimiter:
+    """Return the domain-wide limiter, creating and loading it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    limiter = domain_data.get(CONF_LIMITER)
+    if limiter is None:
+        limiter = domain_data[CONF_LIMITER] = EntsoeLimiter(hass)
+    # a caller arriving while the first one loads must not see unloaded breakers
+    await limiter.async_load()
+    return limiter
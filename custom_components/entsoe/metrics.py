@@ -0,0 +1,154 @@
+"""Hot-path instrumentation for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt
+
+from .const import LATENCY_BUCKETS, METRICS_DAYS
+
+
+class Histogram:
+    """Histogram of durations in seconds with fixed, non-cumulative buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize with the upper bounds of the buckets."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.last: float | None = None
+
+    def observe(self, value: float) -> None:
+        """Record a duration."""
+        index = next(
+            (index for index, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.last = value
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration."""
+        return self.sum / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable form."""
+        labels = [f"<={bound}s" for bound in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": None if self.mean is None else round(self.mean, 6),
+            "last": None if self.last is None else round(self.last, 6),
+        }
+
+
+class FetchMetrics:
+    """Requests, timings and cache use of the ENTSO-e fetches of one bidding zone."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.latency = Histogram()
+        self.parse_time = Histogram()
+        self.payload_bytes = 0
+        self.last_payload_bytes: int | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # requests not sent because the zone's circuit breaker was open
+        self.requests_avoided = 0
+        self.calls_per_day: dict[str, int] = {}
+        self.last_success: datetime | None = None
+        self.last_failure: datetime | None = None
+        self.last_failure_reason: str | None = None
+
+    def record_request(self, latency: float, parse_time: float, payload: int) -> None:
+        """Record one API call."""
+        self.latency.observe(latency)
+        self.parse_time.observe(parse_time)
+        self.payload_bytes += payload
+        self.last_payload_bytes = payload
+        day = dt.utcnow().date().isoformat()
+        self.calls_per_day[day] = self.calls_per_day.get(day, 0) + 1
+        for old in sorted(self.calls_per_day)[:-METRICS_DAYS]:
+            del self.calls_per_day[old]
+
+    def record_success(self) -> None:
+        """Record a fetch that completed."""
+        self.last_success = dt.utcnow()
+
+    def record_failure(self, exc: Exception) -> None:
+        """Record a fetch that failed."""
+        self.last_failure = dt.utcnow()
+        self.last_failure_reason = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def calls_today(self) -> int:
+        """Return the number of API calls made today (UTC)."""
+        return self.calls_per_day.get(dt.utcnow().date().isoformat(), 0)
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        """Return the share of price requests served without calling ENTSO-e, in percent."""
+        total = self.cache_hits + self.cache_misses
+        return round(100 * self.cache_hits / total, 1) if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable form."""
+        return {
+            "latency": self.latency.as_dict(),
+            "parse_time": self.parse_time.as_dict(),
+            "payload_bytes": self.payload_bytes,
+            "last_payload_bytes": self.last_payload_bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": self.cache_hit_ratio,
+            "requests_avoided": self.requests_avoided,
+            "calls_per_day": dict(self.calls_per_day),
+            "last_success": self.last_success,
+            "last_failure": self.last_failure,
+            "last_failure_reason": self.last_failure_reason,
+        }
+
+
+class UpdateMetrics:
+    """Timings and outcome of the updates of one coordinator."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.update_time = Histogram()
+        self.last_success: datetime | None = None
+        self.last_failure: datetime | None = None
+        self.last_failure_reason: str | None = None
+        self.data_until: datetime | None = None
+
+    def record_success(self) -> None:
+        """Record an update that got prices."""
+        self.last_success = dt.utcnow()
+
+    def record_failure(self, exc: Exception) -> None:
+        """Record an update whose fetch failed."""
+        self.last_failure = dt.utcnow()
+        self.last_failure_reason = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def freshness(self) -> float | None:
+        """Return the seconds since the last successful update."""
+        if self.last_success is None:
+            return None
+        return (dt.utcnow() - self.last_success).total_seconds()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable form."""
+        return {
+            "update_time": self.update_time.as_dict(),
+            "last_success": self.last_success,
+            "last_failure": self.last_failure,
+            "last_failure_reason": self.last_failure_reason,
+            "seconds_since_success": self.freshness,
+            "data_until": self.data_until,
+        }
@@ -0,0 +1,71 @@
+"""Start time optimization for appliances with a known energy profile."""
+from __future__ import annotations
+
+from datetime import datetime
+from itertools import groupby
+import math
+
+from .series import PriceSeries
+
+
+def optimize_start(
+    prices: PriceSeries,
+    profile: list[float],
+    profile_resolution: int,
+    earliest: datetime,
+    deadline: datetime | None = None,
+) -> tuple[int, float] | None:
+    """Return the start epoch and cost of the cheapest run of an energy profile.
+
+    The profile holds the kWh used per profile_resolution seconds of the run.
+    Profile and prices are brought to the finer of both resolutions. Every
+    start slot is then costed from prefix sums of the prices, one product per
+    run of equal profile values, so a long constant profile is as cheap to
+    place as a short one. Runs start on a slot boundary at or after earliest,
+    end by the deadline (the end of the known prices by default) and only
+    cover slots with a price. Costs are in price unit times kWh, e.g. €-cent.
+    """
+    resolution = min(prices.resolution, profile_resolution)
+    if prices.resolution % resolution or profile_resolution % resolution:
+        raise ValueError(
+            f"Profile slots of {profile_resolution // 60} minutes don't fit "
+            f"prices of {prices.resolution // 60} minutes"
+        )
+    prices = prices.expanded_to(resolution)
+    split = profile_resolution // resolution
+    # consecutive equal profile slots form one segment, the energy of a coarser
+    # profile slot is spread evenly over its finer slots
+    segments = []
+    size = 0
+    for kwh, slots in groupby(profile):
+        length = len(list(slots)) * split
+        segments.append((size, size + length, kwh / split))
+        size += length
+
+    values = prices.values
+    # missing prices are counted apart, their NaN would spoil every later sum
+    sums = [0.0]
+    missing = [0]
+    for price in values:
+        gap = math.isnan(price)
+        sums.append(sums[-1] + (0.0 if gap else price))
+        missing.append(missing[-1] + gap)
+    # round up, a run starting within the slot holding earliest would be costed from its start
+    first = max(0, -(-(int(earliest.timestamp()) - prices.start) // resolution))
+    last = len(values) - size
+    if deadline is not None:
+        last = min(last, (int(deadline.timestamp()) - prices.start) // resolution - size)
+
+    best = None
+    for start in range(first, last + 1):
+        if missing[start + size] != missing[start]:
+            continue
+        cost = sum(
+            kwh * (sums[start + end] - sums[start + begin])
+            for begin, end, kwh in segments
+        )
+        if best is None or cost < best[1]:
+            best = (start, cost)
+    if best is None:
+        return None
+    return prices.start + best[0] * resolution, best[1]
@@ -0,0 +1,161 @@
+"""Precomputed price lookups for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, tzinfo
+import math
+
+from homeassistant.util import dt
+
+from .series import DayPartition, PriceSeries
+
+
+class PriceIndex:
+    """Ranks and best/worst block starts over the today+tomorrow horizon.
+
+    Everything is computed once per fetch, so lookups for "now" are O(1):
+
+    - ranks: rank of each slot within its local day, 1 being the cheapest
+    - order: all priced slots sorted from cheapest to most expensive
+    - for every window length, the start of the cheapest and the most
+      expensive complete block starting at or after each slot
+    """
+
+    def __init__(
+        self, series: PriceSeries, tz: tzinfo, window_hours: tuple[int, ...]
+    ) -> None:
+        """Build the index of a horizon series."""
+        self.series = series
+        self.tz = tz
+        self.ranks = self._ranks(series, tz)
+        # slots holding a price, cheapest first
+        self.order = array(
+            "i",
+            sorted(
+                (
+                    index
+                    for index in range(len(series))
+                    if not math.isnan(series.values[index])
+                ),
+                key=series.values.__getitem__,
+            ),
+        )
+        self.cheapest: dict[int, array] = {}
+        self.most_expensive: dict[int, array] = {}
+        for hours in window_hours:
+            size = hours * 3600 // series.resolution
+            self.cheapest[hours], self.most_expensive[hours] = self._windows(
+                series.values, size
+            )
+
+    @staticmethod
+    def _ranks(series: PriceSeries, tz: tzinfo) -> array:
+        ranks = array("i", [0]) * len(series)
+        for first, last, _ in DayPartition(series, tz).days.values():
+            indexes = [
+                index
+                for index in range(max(first, 0), min(last, len(series)))
+                if not math.isnan(series.values[index])
+            ]
+            indexes.sort(key=series.values.__getitem__)
+            for rank, index in enumerate(indexes, 1):
+                ranks[index] = rank
+        return ranks
+
+    @staticmethod
+    def _windows(values: array, size: int) -> tuple[array, array]:
+        """Return, per slot, the start of the cheapest and most expensive block at or after it."""
+        count = len(values)
+        prefix = [0.0] * (count + 1)
+        holes = [0] * (count + 1)
+        for index, price in enumerate(values):
+            missing = math.isnan(price)
+            prefix[index + 1] = prefix[index] + (0.0 if missing else price)
+            holes[index + 1] = holes[index] + missing
+        cheapest = array("i", [-1]) * count
+        most_expensive = array("i", [-1]) * count
+        best_min = best_max = -1
+        # walk backwards so every slot knows the best block from there on
+        for start in range(count - size, -1, -1):
+            total = prefix[start + size] - prefix[start]
+            if holes[start + size] == holes[start]:
+                if best_min < 0 or total <= prefix[best_min + size] - prefix[best_min]:
+                    best_min = start
+                if best_max < 0 or total >= prefix[best_max + size] - prefix[best_max]:
+                    best_max = start
+            cheapest[start] = best_min
+            most_expensive[start] = best_max
+        return cheapest, most_expensive
+
+    def _start_time(self, index: int) -> datetime | None:
+        if index < 0:
+            return None
+        return datetime.fromtimestamp(
+            self.series.start + index * self.series.resolution, self.tz
+        )
+
+    def _price(self, index: int | None) -> float | None:
+        if index is None or index >= len(self.series):
+            return None
+        price = self.series.values[index]
+        return None if math.isnan(price) else price
+
+    def current_price(self, now: datetime | None = None) -> float | None:
+        """Return the price of the running slot."""
+        return self._price(self.series.index_of(now or dt.utcnow()))
+
+    def next_price(self, now: datetime | None = None) -> float | None:
+        """Return the price of the slot after the running one."""
+        index = self.series.index_of(now or dt.utcnow())
+        return None if index is None else self._price(index + 1)
+
+    def rank(self, now: datetime | None = None) -> int | None:
+        """Return the rank of the running slot within its day, 1 being the cheapest."""
+        index = self.series.index_of(now or dt.utcnow())
+        if index is None or self.ranks[index] == 0:
+            return None
+        return self.ranks[index]
+
+    def cheapest_start(self, hours: int, now: datetime | None = None) -> datetime | None:
+        """Return the start of the cheapest block of the given length from the running slot on."""
+        index = self.series.index_of(now or dt.utcnow())
+        starts = self.cheapest.get(hours)
+        if index is None or starts is None or index >= len(starts):
+            return None
+        return self._start_time(starts[index])
+
+    def most_expensive_start(
+        self, hours: int, now: datetime | None = None
+    ) -> datetime | None:
+        """Return the start of the most expensive block of the given length from the running slot on."""
+        index = self.series.index_of(now or dt.utcnow())
+        starts = self.most_expensive.get(hours)
+        if index is None or starts is None or index >= len(starts):
+            return None
+        return self._start_time(starts[index])
+
+    def cheapest_slots(
+        self, hours: float, before: datetime | None = None, now: datetime | None = None
+    ) -> list[datetime]:
+        """Return the starts, in time order, of the cheapest slots adding up to hours.
+
+        Only slots from the running one on and starting before the given time
+        are considered; the slots don't need to be consecutive.
+        """
+        first = self.series.index_of(now or dt.utcnow())
+        if first is None:
+            return []
+        last = len(self.series)
+        if before is not None:
+            last = min(
+                last,
+                -(-(int(before.timestamp()) - self.series.start) // self.series.resolution),
+            )
+        wanted = math.ceil(hours * 3600 / self.series.resolution)
+        picked = []
+        for index in self.order:
+            if len(picked) == wanted:
+                break
+            if first <= index < last:
+                picked.append(index)
+        return [self._start_time(index) for index in sorted(picked)]
@@ -0,0 +1,12 @@
+"""Integration platform for recorder."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import PRICE_ATTRIBUTES
+
+
+@callback
+def exclude_attributes(hass: HomeAssistant) -> set[str]:
+    """Exclude the bulky price lists from being recorded in the database."""
+    return set(PRICE_ATTRIBUTES)
@@ -0,0 +1,74 @@
+"""Publication-aware refresh scheduling for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+import random
+
+from homeassistant.util import dt
+
+from .const import (
+    PUBLICATION_EXPECTED,
+    PUBLICATION_START,
+    PUBLICATION_TZ,
+    POLL_JITTER,
+    POLL_MAX_INTERVAL,
+    POLL_MIN_INTERVAL,
+    RETRY_MAX_INTERVAL,
+    RETRY_MIN_INTERVAL,
+)
+
+
+def _jitter(delay: timedelta) -> timedelta:
+    """Spread a delay by +-POLL_JITTER so entries don't poll in lockstep."""
+    return delay * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+
+def _publication_times(now: datetime):
+    """Return the start and expected time of the auction publication on now's day."""
+    tz = dt.get_time_zone(PUBLICATION_TZ)
+    day = now.astimezone(tz).date()
+    return (
+        datetime.combine(day, PUBLICATION_START, tzinfo=tz),
+        datetime.combine(day, PUBLICATION_EXPECTED, tzinfo=tz),
+    )
+
+
+def market_day_end(day: date) -> datetime:
+    """Return when the day-ahead market day of a date ends, midnight Brussels time.
+
+    Local days west of the market's timezone run into the next market day,
+    which is only published the day after.
+    """
+    tz = dt.get_time_zone(PUBLICATION_TZ)
+    return datetime.combine(day + timedelta(days=1), time(), tzinfo=tz)
+
+
+def next_refresh(now: datetime, tomorrow_complete: bool, failures: int = 0) -> datetime:
+    """Return when prices should be fetched next.
+
+    - after failures: exponential backoff between RETRY_MIN_INTERVAL and RETRY_MAX_INTERVAL
+    - with a complete day tomorrow: idle until the next publication window opens
+    - before the window: idle until it opens
+    - inside the window: halve the wait towards the expected publication time,
+      then back off gradually the later the results are
+    """
+    if failures > 0:
+        delay = min(RETRY_MIN_INTERVAL * 2 ** (failures - 1), RETRY_MAX_INTERVAL)
+        return now + _jitter(delay)
+
+    start, expected = _publication_times(now)
+
+    if tomorrow_complete:
+        if now >= start:
+            start, expected = _publication_times(now + timedelta(days=1))
+        return start + random.uniform(0, 1) * POLL_MIN_INTERVAL
+
+    if now < start:
+        return start + random.uniform(0, 1) * POLL_MIN_INTERVAL
+
+    if now < expected:
+        delay = (expected - now) / 2
+    else:
+        delay = (now - expected) / 2
+    delay = min(max(delay, POLL_MIN_INTERVAL), POLL_MAX_INTERVAL)
+    return now + _jitter(delay)
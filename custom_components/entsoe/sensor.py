@@ -1,25 +1,20 @@
 """ENTSO-e current electricity and gas price information service."""
 from __future__ import annotations
 
-from datetime import timedelta
 import logging
 from typing import Any
 
-import pandas as pd
-
 from homeassistant.components.sensor import (
     DOMAIN,
-    # SensorStateClass,
+    SensorStateClass,
     SensorDeviceClass,
     RestoreSensor,
     SensorExtraStoredData,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HassJob, HomeAssistant
-from homeassistant.helpers import event
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import utcnow
 from .const import (
     ATTRIBUTION,
     CONF_COORDINATOR,
@@ -27,9 +22,12 @@ from .const import (
     DOMAIN,
     EntsoeEntityDescription,
     ICON,
+    PRICE_ATTRIBUTES,
     SENSOR_TYPES,
+    stats_descriptions,
 )
 from .coordinator import EntsoeCoordinator
+from .series import PriceSeries
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,20 +42,31 @@ async def async_setup_entry(
 
     entities = []
     entity = {}
-    for description in SENSOR_TYPES:
-        entity = description
-        entities.append(
-            EntsoeSensor(
-                entsoe_coordinator, entity, config_entry.options[CONF_ENTITY_NAME]
+    descriptions = SENSOR_TYPES + stats_descriptions(entsoe_coordinator.percentiles)
+    for area in entsoe_coordinator.areas:
+        for description in descriptions:
+            if description.tariff and entsoe_coordinator.tariff is None:
+                continue
+            entity = description
+            entities.append(
+                EntsoeSensor(
+                    entsoe_coordinator,
+                    entity,
+                    config_entry.options[CONF_ENTITY_NAME],
+                    area,
+                )
             )
-        )
 
-    # Add an entity for each sensor type
+    # Add an entity for each sensor type of each zone
     async_add_entities(entities, True)
 
 
 class EntsoeSensorExtraStoredData(SensorExtraStoredData):
-    """Object to hold extra stored data."""
+    """Object to hold extra stored data.
+
+    Price list attributes are kept in the compact PriceSeries.as_dict() form
+    instead of one {"time", "price"} dict per slot.
+    """
 
     _attr_extra_state_attributes: any
 
@@ -98,7 +107,7 @@ class EntsoeSensorExtraStoredData(SensorExtraStoredData):
         )
 
 
-class EntsoeSensor(CoordinatorEntity):
+class EntsoeSensor(CoordinatorEntity, RestoreSensor):
     """Representation of a ENTSO-e sensor."""
 
     _attr_attribution = ATTRIBUTION
@@ -110,11 +119,24 @@ class EntsoeSensor(CoordinatorEntity):
         coordinator: EntsoeCoordinator,
         description: EntsoeEntityDescription,
         name: str = "",
+        area: str | None = None,
     ) -> None:
-        """Initialize the sensor."""
+        """Initialize the sensor of a zone, the entry's first zone by default."""
         self.description = description
-
-        if name not in (None, ""):
+        self.area = area or coordinator.areas[0]
+
+        if len(coordinator.areas) > 1:
+            # entries with several zones get the zone in ids and names
+            zone = self.area.lower()
+            if name not in (None, ""):
+                self.entity_id = f"{DOMAIN}.{name}_{zone}_{description.key}"
+                self._attr_unique_id = f"entsoe.{name}_{zone}_{description.key}"
+                self._attr_name = f"[ENTSO-e] {description.name} ({name} {self.area})"
+            else:
+                self.entity_id = f"{DOMAIN}.entsoe_{zone}_{description.key}"
+                self._attr_unique_id = f"entsoe.{zone}_{description.key}"
+                self._attr_name = f"[ENTSO-e] {description.name} ({self.area})"
+        elif name not in (None, ""):
             # The Id used for addressing the entity in the ui, recorder history etc.
             self.entity_id = f"{DOMAIN}.{name}_{description.key}"
             # unique id in .storage file for ui configuration.
@@ -125,50 +147,101 @@ class EntsoeSensor(CoordinatorEntity):
             self._attr_unique_id = f"entsoe.{description.key}"
             self._attr_name = f"[ENTSO-e] {description.name}"
 
-        self._attr_device_class = (
-            SensorDeviceClass.MONETARY
-            if description.device_class is None
-            else description.device_class
-        )
+        self._attr_device_class = description.device_class
+        if description.icon is not None:
+            self._attr_icon = description.icon
         self._attr_state_class = None if self._attr_device_class in [SensorDeviceClass.TIMESTAMP, SensorDeviceClass.MONETARY] else SensorStateClass.MEASUREMENT
         self.entity_description: EntsoeEntityDescription = description
-
-        self._update_job = HassJob(self.async_schedule_update_ha_state)
-        self._unsub_update = None
+        self._price_series: dict[str, PriceSeries] = {}
+        # content of the last written state, see _handle_coordinator_update
+        self._written = None
 
         super().__init__(coordinator)
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state while the coordinator has no data."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is not None:
+            return
+        last = await self.async_get_last_extra_data()
+        if last is None:
+            return
+        restored = EntsoeSensorExtraStoredData.from_dict(last.as_dict())
+        if restored is None:
+            return
+        self._attr_native_value = restored.native_value
+        if restored._attr_extra_state_attributes:
+            self._price_series = {
+                x: PriceSeries.from_dict(series)
+                for x, series in restored._attr_extra_state_attributes.items()
+            }
+            self._attr_extra_state_attributes = {
+                x: self.coordinator.get_timestamped_prices(series)
+                for x, series in self._price_series.items()
+            }
+
+    @property
+    def extra_restore_state_data(self) -> EntsoeSensorExtraStoredData:
+        """Return the value and the compact price series to be restored."""
+        return EntsoeSensorExtraStoredData(
+            self.native_value,
+            self.native_unit_of_measurement,
+            {x: series.as_dict() for x, series in self._price_series.items()}
+            or None,
+        )
+
     async def async_update(self) -> None:
         _LOGGER.debug(f"async_update")
         """Get the latest data and updates the states."""
+        self._update_from_coordinator()
+        # the caller writes the state, homeassistant.update_entity without
+        # going through async_write_ha_state
+        self._written = self._state_content()
+
+    def _state_content(self) -> tuple:
+        """Return what the written state shows: availability, value and price lists."""
+        return (
+            self.available,
+            self._attr_native_value,
+            tuple(
+                (key, series.digest()) for key, series in self._price_series.items()
+            ),
+        )
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, remembering its content for _handle_coordinator_update."""
+        self._written = self._state_content()
+        super().async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle new data or a slot boundary tick of the coordinator's clock.
+
+        Most ticks leave the value and the price lists as they were; the state
+        is only written when they changed, so unchanged slots cost no
+        state_changed event, recorder write or frontend push.
+        """
+        self._update_from_coordinator()
+        if self._state_content() == self._written:
+            return
+        self.async_write_ha_state()
+
+    def _update_from_coordinator(self) -> None:
         value: Any = None
-        if self.coordinator.data is not None:
+        if self.coordinator.data is not None and self.area in self.coordinator.data:
+            processed = self.coordinator.processed_data(self.area)
             try:
-                self._attr_native_value = self.entity_description.value_fn(
-                    self.coordinator.processed_data()
-                )
+                self._attr_native_value = self.entity_description.value_fn(processed)
             except Exception as exc:
                 # No data available
                 _LOGGER.warning(
                     f"Unable to update entity due to data processing error: {value} and error: {exc}"
                 )
 
-            selected_keys = {"prices_today", "prices_tomorrow"}
-            for x in selected_keys:
+            for x, data_key in PRICE_ATTRIBUTES.items():
                 if self.description.key == x and self._attr_native_value is not None:
-                    self._attr_extra_state_attributes = {
-                        x: self.coordinator.processed_data()[x]
+                    self._attr_extra_state_attributes = {x: processed[x]}
+                    self._price_series = {
+                        x: self.coordinator.data[self.area][data_key]
                     }
-
-        # Cancel the currently scheduled event if there is any
-        if self._unsub_update:
-            self._unsub_update()
-            self._unsub_update = None
-
-        # Schedule the next update at exactly the next whole hour sharp
-        self._unsub_update = event.async_track_point_in_utc_time(
-            self.hass,
-            self._update_job,
-            utcnow().replace(minute=0, second=0) + timedelta(minutes=60),
-        )
-
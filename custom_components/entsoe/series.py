@@ -0,0 +1,246 @@
+"""Compact price series for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+import math
+from typing import Any
+
+UTC = timezone.utc
+
+
+def local_midnight(day: date, tz: tzinfo) -> datetime:
+    """Return the start of a calendar day in the given timezone."""
+    return datetime.combine(day, time(), tzinfo=tz)
+
+
+class PriceSeries:
+    """Equidistant prices stored as a start epoch, a resolution and an array of floats.
+
+    Slots without a price hold NaN. Slicing by local calendar day works on
+    epochs, so 23 and 25 hour DST days come out right without any labels.
+    """
+
+    __slots__ = ("start", "resolution", "values")
+
+    def __init__(
+        self, start: int, resolution: int, values: array | memoryview | None = None
+    ) -> None:
+        """Initialize the series from a UTC start epoch and a resolution in seconds."""
+        self.start = start
+        self.resolution = resolution
+        self.values = values if values is not None else array("d")
+
+    @classmethod
+    def from_points(cls, points: dict[int, float], resolution: int) -> PriceSeries | None:
+        """Build a series from prices keyed by epoch, filling holes with NaN."""
+        if not points:
+            return None
+        start = min(points)
+        values = array("d", [math.nan]) * ((max(points) - start) // resolution + 1)
+        for epoch, price in points.items():
+            values[(epoch - start) // resolution] = price
+        return cls(start, resolution, values)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PriceSeries:
+        """Restore a series from its compact dict form."""
+        return cls(
+            data["start"],
+            data["resolution"],
+            array(
+                "d", (math.nan if price is None else price for price in data["values"])
+            ),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a compact, JSON serializable form: start epoch, resolution and values."""
+        return {
+            "start": self.start,
+            "resolution": self.resolution,
+            "values": [None if math.isnan(price) else price for price in self.values],
+        }
+
+    def digest(self) -> int:
+        """Return a cheap content hash of the series."""
+        return hash((self.start, self.resolution, self.values.tobytes()))
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self.values)
+
+    @property
+    def end(self) -> int:
+        """Return the epoch at which the last slot ends."""
+        return self.start + len(self.values) * self.resolution
+
+    def count(self) -> int:
+        """Return the number of slots holding a price."""
+        return sum(1 for price in self.values if not math.isnan(price))
+
+    def index_of(self, when: datetime) -> int | None:
+        """Return the slot covering a point in time, if any."""
+        if not len(self.values):
+            return None
+        index = (int(when.timestamp()) - self.start) // self.resolution
+        return index if 0 <= index < len(self.values) else None
+
+    def price_at(self, when: datetime) -> float | None:
+        """Return the price of the slot covering a point in time, if known."""
+        index = self.index_of(when)
+        if index is None or math.isnan(self.values[index]):
+            return None
+        return self.values[index]
+
+    def between(self, start: int, end: int) -> PriceSeries:
+        """Return the slots starting within [start, end) as a new series."""
+        first = max(0, -(-(start - self.start) // self.resolution))
+        last = min(len(self.values), -(-(end - self.start) // self.resolution))
+        return PriceSeries(
+            self.start + first * self.resolution,
+            self.resolution,
+            self.values[first:last] if last > first else array("d"),
+        )
+
+    def view(self, first: int, last: int) -> PriceSeries:
+        """Return the slots [first, last) sharing this series' buffer instead of copying."""
+        first = max(0, first)
+        return PriceSeries(
+            self.start + first * self.resolution,
+            self.resolution,
+            memoryview(self.values)[first:last] if last > first else array("d"),
+        )
+
+    def day(self, day: date, tz: tzinfo) -> PriceSeries:
+        """Return the slots of a local calendar day."""
+        start = local_midnight(day, tz)
+        end = local_midnight(day + timedelta(days=1), tz)
+        return self.between(int(start.timestamp()), int(end.timestamp()))
+
+    def scaled(self, factor: float, ndigits: int) -> PriceSeries:
+        """Return a copy with every price multiplied and rounded."""
+        return PriceSeries(
+            self.start,
+            self.resolution,
+            array("d", (round(price * factor, ndigits) for price in self.values)),
+        )
+
+    def mean_by(self, resolution: int, ndigits: int = 3) -> PriceSeries:
+        """Return the series aggregated to a coarser resolution, e.g. 15 minute prices to hourly means."""
+        if resolution <= self.resolution:
+            return self
+        factor = resolution // self.resolution
+        offset = (self.start % resolution) // self.resolution
+        values = array("d", [math.nan]) * offset
+        values.extend(self.values)
+        means = array("d")
+        for first in range(0, len(values), factor):
+            prices = [price for price in values[first : first + factor] if not math.isnan(price)]
+            means.append(
+                round(sum(prices) / len(prices), ndigits) if prices else math.nan
+            )
+        return PriceSeries(self.start - offset * self.resolution, resolution, means)
+
+    def stats_by(
+        self, resolution: int
+    ) -> Iterator[tuple[int, float, float, float]]:
+        """Yield (start epoch, mean, min, max) per period of the given resolution."""
+        offset = self.start % resolution
+        period_start = self.start - offset
+        prices: list[float] = []
+        for index, price in enumerate(self.values):
+            epoch = self.start + index * self.resolution
+            if epoch >= period_start + resolution:
+                if prices:
+                    yield period_start, sum(prices) / len(prices), min(prices), max(prices)
+                prices = []
+                period_start = epoch - epoch % resolution
+            if not math.isnan(price):
+                prices.append(price)
+        if prices:
+            yield period_start, sum(prices) / len(prices), min(prices), max(prices)
+
+    def expanded_to(self, resolution: int) -> PriceSeries:
+        """Return the series at a finer resolution, repeating each price."""
+        if resolution >= self.resolution:
+            return self
+        factor = self.resolution // resolution
+        values = array("d")
+        for price in self.values:
+            values.extend(array("d", [price]) * factor)
+        return PriceSeries(self.start, resolution, values)
+
+    def items(self, tz: tzinfo = UTC) -> Iterator[tuple[datetime, float]]:
+        """Yield (local start time, price) for every slot holding a price."""
+        for index, price in enumerate(self.values):
+            if not math.isnan(price):
+                yield datetime.fromtimestamp(
+                    self.start + index * self.resolution, tz
+                ), price
+
+
+class DayPartition:
+    """The local calendar days of a series, computed once per fetch.
+
+    Every day knows its slot range in the series and how many slots it has
+    by the timezone's transitions: 23 or 25 hours on DST days. Day views are
+    zero-copy slices of the series.
+    """
+
+    def __init__(self, series: PriceSeries, tz: tzinfo) -> None:
+        """Partition a series into the local days of a timezone."""
+        self.series = series
+        self.tz = tz
+        self.days: dict[date, tuple[int, int, int]] = {}
+        if not len(series):
+            return
+        day = datetime.fromtimestamp(series.start, tz).date()
+        last_day = datetime.fromtimestamp(series.end - 1, tz).date()
+        while day <= last_day:
+            self.days[day] = self._bounds(day)
+            day += timedelta(days=1)
+
+    def _bounds(self, day: date) -> tuple[int, int, int]:
+        """Return the first and last slot index of a day, maybe outside the series, and its slot count."""
+        start = int(local_midnight(day, self.tz).timestamp())
+        end = int(local_midnight(day + timedelta(days=1), self.tz).timestamp())
+        resolution = self.series.resolution
+        return (
+            -(-(start - self.series.start) // resolution),
+            -(-(end - self.series.start) // resolution),
+            (end - start) // resolution,
+        )
+
+    def _range(self, day: date) -> tuple[int, int, int]:
+        return self.days.get(day) or self._bounds(day)
+
+    def expected(self, day: date) -> int:
+        """Return the number of slots of a local day."""
+        return self._range(day)[2]
+
+    def day(self, day: date) -> PriceSeries:
+        """Return the slots of a local day as a view; empty, but starting at midnight, if unknown."""
+        first, last, _ = self._range(day)
+        if last <= 0 or first >= len(self.series):
+            return PriceSeries(
+                self.series.start + first * self.series.resolution,
+                self.series.resolution,
+            )
+        return self.series.view(first, min(last, len(self.series)))
+
+    def complete(self, day: date, until: int | None = None) -> bool:
+        """Return if every slot of a local day holds a price, up to an optional end epoch.
+
+        The end lets a day west of the market's timezone count as complete
+        without the slots that belong to the next, unpublished market day.
+        """
+        first, last, expected = self._range(day)
+        if until is not None:
+            cut = -(-(until - self.series.start) // self.series.resolution)
+            if cut < last:
+                expected -= last - cut
+                last = cut
+        if last <= 0 or first >= len(self.series):
+            return expected <= 0
+        return self.series.view(first, min(last, len(self.series))).count() == expected
@@ -0,0 +1,311 @@
+"""Services of the ENTSO-e prices component."""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timedelta
+from functools import partial
+import logging
+
+from aiohttp import ClientError
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt
+
+from .client import EntsoeClient, EntsoeError
+from .columnar import ColumnarPriceFile, export_csv, export_parquet, price_file_path
+from .const import (
+    AREA_INFO,
+    BACKFILL_CHUNK_DAYS,
+    BACKFILL_CONCURRENCY,
+    CONF_API_KEY,
+    CONF_AREA,
+    DOMAIN,
+    PRICE_UNIT,
+)
+from .coordinator import zone_data
+from .limiter import async_get_limiter
+from .optimizer import optimize_start
+from .series import PriceSeries
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BACKFILL = "backfill"
+SERVICE_OPTIMIZE_START = "optimize_start"
+SERVICE_EXPORT_PRICES = "export_prices"
+
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_DEVICES = "devices"
+ATTR_NAME = "name"
+ATTR_PROFILE = "profile"
+ATTR_PROFILE_MINUTES = "profile_minutes"
+ATTR_EARLIEST_START = "earliest_start"
+ATTR_DEADLINE = "deadline"
+ATTR_FINAL_PRICE = "final_price"
+ATTR_FORMAT = "format"
+ATTR_PATH = "path"
+
+EXPORT_FORMATS = {"csv": export_csv, "parquet": export_parquet}
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_AREA): vol.In(list(AREA_INFO)),
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+    }
+)
+
+OPTIMIZE_START_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_AREA): vol.In(list(AREA_INFO)),
+        vol.Optional(ATTR_FINAL_PRICE, default=True): cv.boolean,
+        vol.Required(ATTR_DEVICES): vol.All(
+            cv.ensure_list,
+            [
+                {
+                    vol.Optional(ATTR_NAME): cv.string,
+                    vol.Required(ATTR_PROFILE): vol.All(
+                        cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0))]
+                    ),
+                    vol.Optional(ATTR_PROFILE_MINUTES, default=60): vol.All(
+                        vol.Coerce(int), vol.Range(min=1)
+                    ),
+                    vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+                    vol.Optional(ATTR_DEADLINE): cv.datetime,
+                }
+            ],
+        ),
+    }
+)
+
+EXPORT_PRICES_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_AREA): vol.In(list(AREA_INFO)),
+        vol.Optional(ATTR_FORMAT, default="csv"): vol.In(list(EXPORT_FORMATS)),
+        vol.Optional(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_PATH): cv.string,
+    }
+)
+
+
+def statistic_id(area: str) -> str:
+    """Return the id of the long-term statistics of a bidding zone code."""
+    return f"{DOMAIN}:day_ahead_price_{area.lower()}"
+
+
+def _api_key(hass: HomeAssistant) -> str:
+    """Return the API key of the first configured entry."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if api_key := entry.options.get(CONF_API_KEY):
+            return api_key
+    raise HomeAssistantError("No ENTSO-e API key configured")
+
+
+def _chunks(start_date: date, end_date: date):
+    """Split [start_date, end_date] into ranges ENTSO-e answers in one request."""
+    start = datetime.combine(start_date, datetime.min.time(), tzinfo=dt.UTC)
+    end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tzinfo=dt.UTC)
+    while start < end:
+        chunk_end = min(start + timedelta(days=BACKFILL_CHUNK_DAYS), end)
+        yield start, chunk_end - timedelta(seconds=1)
+        start = chunk_end
+
+
+async def async_backfill(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Fetch a date range of prices and import hourly mean/min/max statistics."""
+    if "recorder" not in hass.config.components:
+        raise HomeAssistantError("The recorder is needed to backfill statistics")
+    # the recorder pulls in SQLAlchemy, only import it when actually backfilling
+    from homeassistant.components.recorder.models import (
+        StatisticData,
+        StatisticMetaData,
+    )
+    from homeassistant.components.recorder.statistics import (
+        async_add_external_statistics,
+    )
+
+    if call.data[ATTR_END_DATE] < call.data[ATTR_START_DATE]:
+        raise HomeAssistantError("The end date is before the start date")
+
+    area = AREA_INFO[call.data[CONF_AREA]]["code"]
+    client = EntsoeClient(async_get_clientsession(hass), _api_key(hass))
+    limiter = await async_get_limiter(hass)
+    semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+    async def fetch(start: datetime, end: datetime) -> PriceSeries | None:
+        async with semaphore:
+            # shares the request budget and the zone's breaker with the live fetches
+            return await limiter.async_request(
+                area, partial(client.query_day_ahead_prices, area, start, end)
+            )
+
+    chunks = list(_chunks(call.data[ATTR_START_DATE], call.data[ATTR_END_DATE]))
+    tasks = [asyncio.ensure_future(fetch(start, end)) for start, end in chunks]
+    try:
+        results = await asyncio.gather(*tasks)
+    except (EntsoeError, ClientError, asyncio.TimeoutError) as exc:
+        raise HomeAssistantError(f"Backfilling ENTSO-e prices failed: {exc}") from exc
+    finally:
+        # one failed chunk fails the backfill, don't spend the budget on the others
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    statistics = []
+    for data in results:
+        if data is None:
+            continue
+        # convert all prices from €/MWh to €-cent/kWh = divide by 10.0
+        for start, mean, low, high in data.scaled(0.1, 3).stats_by(3600):
+            statistics.append(
+                StatisticData(
+                    start=dt.utc_from_timestamp(start),
+                    mean=round(mean, 3),
+                    min=low,
+                    max=high,
+                )
+            )
+
+    metadata = StatisticMetaData(
+        has_mean=True,
+        has_sum=False,
+        name=f"ENTSO-e day-ahead price {area}",
+        source=DOMAIN,
+        statistic_id=statistic_id(area),
+        unit_of_measurement=PRICE_UNIT,
+    )
+    async_add_external_statistics(hass, metadata, statistics)
+    _LOGGER.info(
+        f"Imported {len(statistics)} hours of ENTSO-e prices for {area} in {len(chunks)} requests"
+    )
+
+
+def optimize(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return the cheapest start of every device's energy profile."""
+    data = zone_data(hass, call.data[CONF_AREA])
+    if data is None:
+        raise HomeAssistantError(f"No prices loaded for {call.data[CONF_AREA]}")
+    # consumer prices if a tariff is configured, else the spot prices of the horizon
+    if call.data[ATTR_FINAL_PRICE] and "final" in data:
+        prices = data["final"]
+    else:
+        prices = data["index"].series
+
+    now = dt.utcnow()
+    results = []
+    for device in call.data[ATTR_DEVICES]:
+        earliest = dt.as_utc(device.get(ATTR_EARLIEST_START) or now)
+        deadline = device.get(ATTR_DEADLINE)
+        profile_resolution = device[ATTR_PROFILE_MINUTES] * 60
+        try:
+            best = optimize_start(
+                prices,
+                device[ATTR_PROFILE],
+                profile_resolution,
+                max(earliest, now),
+                dt.as_utc(deadline) if deadline is not None else None,
+            )
+        except ValueError as exc:
+            raise HomeAssistantError(str(exc)) from exc
+        result = {
+            ATTR_NAME: device.get(ATTR_NAME),
+            "start": None,
+            "end": None,
+            "cost": None,
+            "average_price": None,
+        }
+        if best is not None:
+            start, cost = best
+            energy = sum(device[ATTR_PROFILE])
+            # starts are slot aligned and not before earliest, runs end by the deadline
+            begin = dt.utc_from_timestamp(start)
+            result.update(
+                start=dt.as_local(begin).isoformat(),
+                end=dt.as_local(
+                    begin + timedelta(seconds=profile_resolution * len(device[ATTR_PROFILE]))
+                ).isoformat(),
+                # prices are in €-cent/kWh
+                cost=round(cost / 100, 4),
+                average_price=round(cost / energy, 3) if energy else None,
+            )
+        results.append(result)
+    return {ATTR_DEVICES: results}
+
+
+async def async_export_prices(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Export a range of a zone's columnar price file as CSV or Parquet."""
+    area = AREA_INFO[call.data[CONF_AREA]]["code"]
+    file_format = call.data[ATTR_FORMAT]
+    # next to the price file by default, elsewhere only in allowlist_external_dirs
+    path = call.data.get(ATTR_PATH)
+    if path is None:
+        path = hass.config.path(DOMAIN, f"{area}.{file_format}")
+    elif not hass.config.is_allowed_path(path):
+        raise HomeAssistantError(f"Writing to {path} is not allowed")
+
+    start = end = None
+    if ATTR_START_DATE in call.data:
+        start = int(dt.start_of_local_day(call.data[ATTR_START_DATE]).timestamp())
+    if ATTR_END_DATE in call.data:
+        end = int(
+            dt.start_of_local_day(
+                call.data[ATTR_END_DATE] + timedelta(days=1)
+            ).timestamp()
+        )
+
+    source = ColumnarPriceFile(price_file_path(hass, area))
+    try:
+        rows = await hass.async_add_executor_job(
+            EXPORT_FORMATS[file_format], source, path, start, end
+        )
+    except ImportError as exc:
+        raise HomeAssistantError(
+            "Exporting to Parquet needs the pyarrow package"
+        ) from exc
+    except OSError as exc:
+        raise HomeAssistantError(f"Exporting the prices of {area} failed: {exc}") from exc
+    _LOGGER.info(f"Exported {rows} prices of {area} to {path}")
+    return {ATTR_PATH: path, "rows": rows}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the component."""
+
+    async def handle_backfill(call: ServiceCall) -> None:
+        await async_backfill(hass, call)
+
+    async def handle_optimize_start(call: ServiceCall) -> ServiceResponse:
+        return optimize(hass, call)
+
+    async def handle_export_prices(call: ServiceCall) -> ServiceResponse:
+        return await async_export_prices(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, handle_backfill, schema=BACKFILL_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_OPTIMIZE_START,
+        handle_optimize_start,
+        schema=OPTIMIZE_START_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_PRICES,
+        handle_export_prices,
+        schema=EXPORT_PRICES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,80 @@
+"""Daily price statistics for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, tzinfo
+import math
+
+from .series import PriceSeries
+
+
+@dataclass(frozen=True)
+class DayStats:
+    """Statistics of the prices of one day; all None for a day without prices."""
+
+    count: int = 0
+    mean: float | None = None
+    median: float | None = None
+    min: float | None = None
+    max: float | None = None
+    std: float | None = None
+    min_time: datetime | None = None
+    max_time: datetime | None = None
+    percentiles: dict[int, float] = field(default_factory=dict)
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """Return a percentile of sorted values, interpolating between neighbours."""
+    position = (len(ordered) - 1) * percent / 100
+    low = math.floor(position)
+    high = math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def day_stats(
+    series: PriceSeries, tz: tzinfo, percentiles: tuple[int, ...] = (), ndigits: int = 3
+) -> DayStats:
+    """Return the statistics of a day's prices.
+
+    Sum, sum of squares and the cheapest and most expensive slot are collected
+    in one pass over the prices; the median and percentiles come from a single
+    sort of the same values.
+    """
+    prices = []
+    total = squares = 0.0
+    low_index = high_index = -1
+    for index, price in enumerate(series.values):
+        if math.isnan(price):
+            continue
+        prices.append(price)
+        total += price
+        squares += price * price
+        if low_index < 0 or price < series.values[low_index]:
+            low_index = index
+        if high_index < 0 or price > series.values[high_index]:
+            high_index = index
+    if not prices:
+        return DayStats()
+
+    count = len(prices)
+    mean = total / count
+    prices.sort()
+    return DayStats(
+        count=count,
+        mean=round(mean, ndigits),
+        median=round(_percentile(prices, 50), ndigits),
+        min=prices[0],
+        max=prices[-1],
+        # population standard deviation, clamped against rounding below zero
+        std=round(math.sqrt(max(squares / count - mean * mean, 0.0)), ndigits),
+        min_time=datetime.fromtimestamp(
+            series.start + low_index * series.resolution, tz
+        ),
+        max_time=datetime.fromtimestamp(
+            series.start + high_index * series.resolution, tz
+        ),
+        percentiles={
+            percent: round(_percentile(prices, percent), ndigits)
+            for percent in percentiles
+        },
+    )
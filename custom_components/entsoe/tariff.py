@@ -0,0 +1,100 @@
+"""Consumer price tariff for the ENTSO-e prices component."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, time, tzinfo
+from typing import Any
+
+import voluptuous as vol
+
+from .const import CONF_FIXED_ADDER, CONF_GRID_FEES, CONF_VAT, WEEKDAYS
+from .series import PriceSeries
+
+
+def _time(value: Any) -> time:
+    """Validate a HH:MM time, 24:00 being the end of the day."""
+    if str(value) in ("24:00", "24:00:00"):
+        return time.max
+    try:
+        return time.fromisoformat(str(value))
+    except ValueError as exc:
+        raise vol.Invalid(f"Invalid time: {value}") from exc
+
+
+GRID_FEE_SCHEMA = vol.Schema(
+    [
+        {
+            vol.Optional("days", default=list(WEEKDAYS)): [vol.In(WEEKDAYS)],
+            vol.Optional("start", default="00:00"): _time,
+            vol.Optional("end", default="24:00"): _time,
+            vol.Required("fee"): vol.Coerce(float),
+        }
+    ]
+)
+
+
+class Tariff:
+    """Turns spot prices into consumer prices, all in €-cent/kWh.
+
+    final = (spot + fixed adder + grid fee) * (1 + VAT / 100)
+
+    The grid fee depends on the local weekday and time of day: the first
+    rule whose days and [start, end) time range cover a slot applies, slots
+    without one pay no fee. A range ending at or before its start runs past
+    midnight into the next day, e.g. a night tariff from 22:00 to 06:00.
+    The rules are expanded once into a table with one fee per minute of the
+    week.
+    """
+
+    def __init__(
+        self, fixed_adder: float = 0.0, vat: float = 0.0, grid_fees: list | None = None
+    ) -> None:
+        """Initialize the tariff from its options."""
+        self.fixed_adder = fixed_adder
+        self.vat = vat
+        self._week = array("d", [0.0]) * (7 * 1440)
+        filled = bytearray(7 * 1440)
+        for rule in GRID_FEE_SCHEMA(grid_fees or []):
+            first = rule["start"].hour * 60 + rule["start"].minute
+            last = (
+                1440
+                if rule["end"] == time.max
+                else rule["end"].hour * 60 + rule["end"].minute
+            )
+            # an end at or before the start runs into the next day, e.g. 22:00-06:00
+            length = (last - first) % 1440 or 1440
+            for day in rule["days"]:
+                offset = WEEKDAYS.index(day) * 1440 + first
+                for minute in range(offset, offset + length):
+                    # Sunday night continues on Monday morning
+                    minute %= 7 * 1440
+                    if not filled[minute]:
+                        self._week[minute] = rule["fee"]
+                        filled[minute] = 1
+
+    @classmethod
+    def from_options(cls, options) -> Tariff | None:
+        """Return the tariff configured in a config entry's options, if any."""
+        if not any(
+            options.get(key) for key in (CONF_FIXED_ADDER, CONF_VAT, CONF_GRID_FEES)
+        ):
+            return None
+        return cls(
+            options.get(CONF_FIXED_ADDER) or 0.0,
+            options.get(CONF_VAT) or 0.0,
+            options.get(CONF_GRID_FEES),
+        )
+
+    def apply(self, series: PriceSeries, tz: tzinfo, ndigits: int = 3) -> PriceSeries:
+        """Return the consumer prices of a spot price series in one pass."""
+        factor = 1 + self.vat / 100
+        week = self._week
+        values = array("d")
+        epoch = series.start
+        for price in series.values:
+            local = datetime.fromtimestamp(epoch, tz)
+            fee = week[local.weekday() * 1440 + local.hour * 60 + local.minute]
+            # NaN (no price) stays NaN
+            values.append(round((price + self.fixed_adder + fee) * factor, ndigits))
+            epoch += series.resolution
+        return PriceSeries(series.start, series.resolution, values)
@@ -0,0 +1,140 @@
+"""Template functions of the ENTSO-e prices component.
+
+Templates like `{{ entsoe_price_at('SE_3', now() + timedelta(hours=2)) }}` are
+answered from the coordinators' precomputed series and price index, instead
+of looping over the prices_today attribute in Jinja.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+from functools import wraps
+import logging
+from typing import Any
+
+from jinja2 import pass_context
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.template import Template, TemplateEnvironment
+from homeassistant.util import dt
+
+from .const import DOMAIN
+from .coordinator import zone_data
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_TEMPLATE_FUNCTIONS = f"{DOMAIN}_template_functions"
+
+
+def _as_datetime(value: Any) -> datetime | None:
+    """Return a template argument as an aware datetime, naive ones being local time."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        parsed = dt.parse_datetime(str(value))
+        if parsed is None:
+            raise ValueError(f"Invalid date/time: {value}")
+        value = parsed
+    return dt.as_utc(value)
+
+
+def price_at(hass: HomeAssistant, zone: str, when: Any = None) -> float | None:
+    """Return the price in €-cent/kWh of a zone at a time, now by default."""
+    data = zone_data(hass, zone)
+    if data is None:
+        return None
+    return data["data"].price_at(_as_datetime(when) or dt.utcnow())
+
+
+def cheapest_hours(
+    hass: HomeAssistant, zone: str, hours: float, before: Any = None
+) -> list[datetime]:
+    """Return the starts of the cheapest slots adding up to hours, from now until before."""
+    data = zone_data(hass, zone)
+    if data is None:
+        return []
+    return data["index"].cheapest_slots(hours, _as_datetime(before))
+
+
+def rank(hass: HomeAssistant, zone: str, when: Any = None) -> int | None:
+    """Return the rank of a slot within its day, 1 being the cheapest, now by default."""
+    data = zone_data(hass, zone)
+    if data is None:
+        return None
+    return data["index"].rank(_as_datetime(when))
+
+
+TEMPLATE_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "entsoe_price_at": price_at,
+    "entsoe_cheapest_hours": cheapest_hours,
+    "entsoe_rank": rank,
+}
+
+
+def _add_functions(env: TemplateEnvironment, hass: HomeAssistant) -> None:
+    """Add the functions to a template environment as globals."""
+    for name, func in TEMPLATE_FUNCTIONS.items():
+        # marked as context functions so they are evaluated on every render
+        env.globals[name] = pass_context(
+            lambda _context, *args, func=func: func(hass, *args)
+        )
+
+
+def _hook_template_environments() -> None:
+    """Add the functions to every template environment created from now on.
+
+    Home Assistant caches the normal, strict and limited environments, but
+    creates a new one for every template rendered with a log function, like
+    the template editor in the developer tools and template entity previews.
+    Limited environments render untrusted templates and don't get them.
+    """
+    if getattr(TemplateEnvironment.__init__, "_entsoe", False):
+        return
+    original = TemplateEnvironment.__init__
+
+    @wraps(original)
+    def __init__(self, hass, limited=False, *args, **kwargs):
+        original(self, hass, limited, *args, **kwargs)
+        if hass is not None and not limited and hass.data.get(DATA_TEMPLATE_FUNCTIONS):
+            _add_functions(self, hass)
+
+    __init__._entsoe = True
+    TemplateEnvironment.__init__ = __init__
+
+
+def _cached_environments(hass: HomeAssistant) -> list[TemplateEnvironment]:
+    """Return the cached normal and strict environments, creating them if needed."""
+    environments = []
+    for strict in (False, True):
+        template = Template("{{ 0 }}", hass)
+        template.async_render(strict=strict)
+        environments.append(template._env)
+    return environments
+
+
+def async_setup_template_functions(hass: HomeAssistant) -> None:
+    """Add the functions to the template environments of Home Assistant.
+
+    Home Assistant has no API for this: new environments get the functions
+    from a hook on their creation, the cached ones that may already exist
+    are reached by rendering a trivial template in each variant.
+    """
+    if hass.data.get(DATA_TEMPLATE_FUNCTIONS):
+        return
+    hass.data[DATA_TEMPLATE_FUNCTIONS] = True
+    _hook_template_environments()
+    for env in _cached_environments(hass):
+        _add_functions(env, hass)
+    _LOGGER.debug(f"Registered template functions {', '.join(TEMPLATE_FUNCTIONS)}")
+
+
+def async_unload_template_functions(hass: HomeAssistant) -> None:
+    """Remove the functions and the hook, once the last entry is unloaded."""
+    if not hass.data.pop(DATA_TEMPLATE_FUNCTIONS, False):
+        return
+    if getattr(TemplateEnvironment.__init__, "_entsoe", False):
+        TemplateEnvironment.__init__ = TemplateEnvironment.__init__.__wrapped__
+    for env in _cached_environments(hass):
+        for name in TEMPLATE_FUNCTIONS:
+            env.globals.pop(name, None)
+    _LOGGER.debug("Removed the template functions")
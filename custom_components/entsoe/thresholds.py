@@ -0,0 +1,97 @@
+"""Price thresholds of the ENTSO-e prices component."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+import math
+
+import voluptuous as vol
+
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import slugify
+
+from .series import PriceSeries
+
+ATTR_BELOW = "below"
+ATTR_ABOVE = "above"
+ATTR_FINAL = "final"
+
+
+def threshold_key(rule: dict) -> str:
+    """Return the key of a threshold, used in entity ids and the coordinator data."""
+    return f"threshold_{slugify(rule['name'])}"
+
+
+def _unique_names(rules: list[dict]) -> list[dict]:
+    """Validate that no two thresholds get the same entity."""
+    keys = [threshold_key(rule) for rule in rules]
+    if len(set(keys)) != len(keys):
+        raise vol.Invalid("Threshold names must be unique")
+    return rules
+
+
+THRESHOLD_SCHEMA = vol.All(
+    cv.ensure_list,
+    [
+        vol.All(
+            {
+                vol.Required("name"): cv.string,
+                vol.Exclusive(ATTR_BELOW, "comparison"): vol.Coerce(float),
+                vol.Exclusive(ATTR_ABOVE, "comparison"): vol.Coerce(float),
+                vol.Optional(ATTR_FINAL, default=False): cv.boolean,
+            },
+            cv.has_at_least_one_key(ATTR_BELOW, ATTR_ABOVE),
+        )
+    ],
+    _unique_names,
+)
+
+
+class Transitions:
+    """The on/off state of a threshold over a price series, as a list of changes.
+
+    Slot i of the states holds the state from epochs[i] until epochs[i + 1];
+    None while no price is known, which is also the state after the last
+    transition.
+    """
+
+    __slots__ = ("epochs", "states")
+
+    def __init__(self) -> None:
+        """Initialize without any known state."""
+        self.epochs = array("q")
+        self.states: list[bool | None] = []
+
+    def _append(self, epoch: int, state: bool | None) -> None:
+        if not self.states or self.states[-1] is not state:
+            self.epochs.append(epoch)
+            self.states.append(state)
+
+    def state_at(self, epoch: int) -> bool | None:
+        """Return the state at a point in time."""
+        index = bisect_right(self.epochs, epoch) - 1
+        return self.states[index] if index >= 0 else None
+
+    def next_change(self, epoch: int) -> int | None:
+        """Return the epoch of the first transition after a point in time, if any."""
+        index = bisect_right(self.epochs, epoch)
+        return self.epochs[index] if index < len(self.epochs) else None
+
+
+def price_transitions(
+    series: PriceSeries, below: float | None = None, above: float | None = None
+) -> Transitions:
+    """Return when prices go below (or above) a threshold and back, in one pass."""
+    transitions = Transitions()
+    epoch = series.start
+    for price in series.values:
+        if math.isnan(price):
+            state = None
+        elif below is not None:
+            state = price < below
+        else:
+            state = price > above
+        transitions._append(epoch, state)
+        epoch += series.resolution
+    transitions._append(series.end, None)
+    return transitions
@@ -0,0 +1,128 @@
+"""Websocket API of the ENTSO-e prices component.
+
+`entsoe/subscribe_prices` sends the prices of today and tomorrow once as a
+compact snapshot, then only what changed:
+
+    {"type": "snapshot", "start": 1695074400, "resolution": 3600, "values": [...]}
+    {"type": "delta", "start": 1695160800, "offset": 24, "values": [...]}
+
+On a delta, drop (delta start - current start) / resolution values from
+the front, keep the first `offset` of the rest and append `values`. Missing
+prices are null.
+
+A subscription follows the zone rather than one coordinator, so it survives
+reloads of the config entry: the new coordinator's first data arrives as a
+delta, usually an empty one that isn't sent.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import AREA_INFO, CONF_AREA, SIGNAL_PRICES_UPDATED
+from .coordinator import zone_coordinator
+from .series import PriceSeries
+
+ATTR_FINAL = "final"
+
+
+def _price_series(coordinator, area: str, final: bool) -> PriceSeries | None:
+    """Return the today+tomorrow series of a zone, consumer prices if asked and configured."""
+    if coordinator is None or coordinator.data is None:
+        return None
+    if area not in coordinator.data:
+        return None
+    zone = coordinator.data[area]
+    if final and "final" in zone:
+        return zone["final"]
+    return zone["index"].series
+
+
+def _values(series: PriceSeries, first: int = 0) -> list[float | None]:
+    return [
+        None if math.isnan(price) else price for price in series.values[first:]
+    ]
+
+
+def price_delta(old: PriceSeries, new: PriceSeries) -> dict[str, Any] | None:
+    """Return the delta turning old into new, a snapshot if that is simpler, or None."""
+    if old.resolution != new.resolution or new.start < old.start:
+        return {"type": "snapshot", **new.as_dict()}
+    shift = (new.start - old.start) // new.resolution
+    kept = old.values[shift:] if shift < len(old) else []
+    offset = 0
+    for old_price, new_price in zip(kept, new.values):
+        if old_price != new_price and not (
+            math.isnan(old_price) and math.isnan(new_price)
+        ):
+            break
+        offset += 1
+    if shift == 0 and offset == len(kept) == len(new):
+        return None
+    return {
+        "type": "delta",
+        "start": new.start,
+        "offset": offset,
+        "values": _values(new, offset),
+    }
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entsoe/subscribe_prices",
+        vol.Required(CONF_AREA): vol.In(list(AREA_INFO)),
+        vol.Optional(ATTR_FINAL, default=False): bool,
+    }
+)
+@callback
+def ws_subscribe_prices(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Subscribe to the prices of a zone."""
+    coordinator = zone_coordinator(hass, msg[CONF_AREA])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"{msg[CONF_AREA]} is not configured"
+        )
+        return
+    area = AREA_INFO[msg[CONF_AREA]]["code"]
+    sent = _price_series(coordinator, area, msg[ATTR_FINAL])
+
+    @callback
+    def forward_prices() -> None:
+        """Send what changed, slot ticks without new data send nothing."""
+        nonlocal sent
+        # looked up on every update, a reload replaces the coordinator
+        series = _price_series(zone_coordinator(hass, area), area, msg[ATTR_FINAL])
+        if series is None or series is sent:
+            return
+        if sent is None:
+            message = {"type": "snapshot", **series.as_dict()}
+        else:
+            message = price_delta(sent, series)
+        sent = series
+        if message is not None:
+            connection.send_message(websocket_api.event_message(msg["id"], message))
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_PRICES_UPDATED.format(area), forward_prices
+    )
+    connection.send_result(msg["id"])
+    if sent is not None:
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"], {"type": "snapshot", **sent.as_dict()}
+            )
+        )
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the component."""
+    websocket_api.async_register_command(hass, ws_subscribe_prices)
@@ -0,0 +1,230 @@
+"""Benchmark the ENTSO-e update path against a local stand-in for the API.
+
+Runs the client, EntsoeCoordinator._async_update_data, processed_data and
+EntsoeSensor.async_update against a local aiohttp server that serves
+Publication_MarketDocument XML, and reports latency, allocations and peak
+memory per step. Scenarios cover a normal day, the 25 hour DST day, 15 minute
+resolution and several zones served by one server.
+
+The documents are generated per request rather than recorded fixtures,
+and this is a standalone script rather than a pytest-benchmark suite: it
+reports allocations and peak memory, which pytest-benchmark doesn't, and
+keeps the benchmark out of the test run.
+
+Needs Home Assistant 2023.9 or later installed; run from the repository root:
+
+    make benchmark
+    python scripts/benchmark.py [--rounds 20]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+import math
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+import tracemalloc
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.entsoe.client import EntsoeClient  # noqa: E402
+from custom_components.entsoe.const import AREA_EIC, SENSOR_TYPES  # noqa: E402
+from custom_components.entsoe.coordinator import EntsoeCoordinator  # noqa: E402
+from custom_components.entsoe.hub import EntsoeHub  # noqa: E402
+from custom_components.entsoe.limiter import EntsoeLimiter, TokenBucket  # noqa: E402
+from custom_components.entsoe.sensor import EntsoeSensor  # noqa: E402
+
+MARKET_TZ = ZoneInfo("Europe/Brussels")
+EIC_AREA = {eic: area for area, eic in AREA_EIC.items()}
+API_KEY = "benchmark"
+
+NS = "urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3"
+
+
+def _utc(when: datetime) -> str:
+    return when.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%MZ")
+
+
+def price_document(area: str, first: date, last: date, resolution: int) -> bytes:
+    """Return a Publication_MarketDocument with one Period per market day."""
+    seed = sum(map(ord, area))
+    series = []
+    day = first
+    while day <= last:
+        start = datetime.combine(day, datetime.min.time(), tzinfo=MARKET_TZ)
+        end = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=MARKET_TZ)
+        count = int(end.timestamp() - start.timestamp()) // resolution
+        points = "".join(
+            f"<Point><position>{position}</position><price.amount>"
+            f"{50 + 40 * math.sin((position + seed) / count * 2 * math.pi):.2f}"
+            "</price.amount></Point>"
+            for position in range(1, count + 1)
+        )
+        series.append(
+            "<TimeSeries><businessType>A62</businessType><curveType>A01</curveType>"
+            f"<Period><timeInterval><start>{_utc(start)}</start><end>{_utc(end)}</end>"
+            f"</timeInterval><resolution>PT{resolution // 60}M</resolution>{points}"
+            "</Period></TimeSeries>"
+        )
+        day += timedelta(days=1)
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?><Publication_MarketDocument xmlns="{NS}">'
+        + "".join(series)
+        + "</Publication_MarketDocument>"
+    ).encode()
+
+
+class StandIn:
+    """Local ENTSO-e API serving generated price documents."""
+
+    def __init__(self, resolution: int = 3600) -> None:
+        self.resolution = resolution
+        self.requests = 0
+        self.bytes = 0
+        self.url = None
+        self._runner = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        start = datetime.strptime(request.query["periodStart"], "%Y%m%d%H%M")
+        end = datetime.strptime(request.query["periodEnd"], "%Y%m%d%H%M")
+        start = start.replace(tzinfo=timezone.utc).astimezone(MARKET_TZ).date()
+        end = end.replace(tzinfo=timezone.utc).astimezone(MARKET_TZ).date()
+        body = price_document(
+            EIC_AREA[request.query["in_Domain"]], start, end, self.resolution
+        )
+        self.bytes += len(body)
+        return web.Response(body=body, content_type="application/xml")
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/api", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/api"
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+
+async def measure(name: str, rounds: int, func, report: list) -> None:
+    """Time an async callable and record its allocations and peak memory."""
+    timings = []
+    for _ in range(rounds):
+        begin = perf_counter()
+        await func()
+        timings.append(perf_counter() - begin)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    await func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+    report.append(
+        (name, statistics.median(timings) * 1000, max(timings) * 1000, allocated, peak)
+    )
+
+
+async def run(rounds: int) -> None:
+    report: list = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        # Home Assistant takes its configuration directory since 2023.9
+        hass = HomeAssistant(config_dir)
+
+        for label, resolution in (("60 min", 3600), ("15 min", 900)):
+            stand_in = StandIn(resolution)
+            await stand_in.start()
+
+            limiter = EntsoeLimiter(hass)
+            # the stand-in has no request budget, don't measure the token bucket's waits
+            limiter.bucket = TokenBucket(1e9, 1000)
+            hub = EntsoeHub(hass, API_KEY, "FI", 7, limiter)
+            hub.client = EntsoeClient(hub.client._session, API_KEY, stand_in.url)
+            hub.subscribe("Europe/Helsinki")
+            await hub.async_load()
+
+            for day_label, day in (("normal day", date(2023, 9, 18)), ("DST day", date(2023, 10, 29))):
+                start = datetime.combine(day, datetime.min.time(), tzinfo=MARKET_TZ)
+                end = start + timedelta(days=1, seconds=-1)
+                await measure(
+                    f"fetch+parse {label}, {day_label}",
+                    rounds,
+                    lambda: hub.client.query_day_ahead_prices("FI", start, end),
+                    report,
+                )
+
+            zones = ("SE_1", "SE_2", "SE_3", "SE_4", "NO_1", "NO_2", "NO_3", "NO_4", "NO_5", "DK_1", "DK_2")
+            await measure(
+                f"fetch+parse {label}, {len(zones)} zones",
+                rounds,
+                lambda: asyncio.gather(
+                    *(hub.client.query_day_ahead_prices(zone, start, end) for zone in zones)
+                ),
+                report,
+            )
+
+            coordinator = EntsoeCoordinator(
+                hass, hubs={"FI": hub}, timezone="FI", resolution="native"
+            )
+
+            async def update():
+                # start from an empty archive so every round really fetches and parses
+                hub.archive._prices = {}
+                hub._fetched_at = None
+                coordinator.data = await coordinator._async_update_data()
+
+            await measure(f"coordinator update {label}", rounds, update, report)
+
+            async def processed():
+                coordinator._processed = {}
+                coordinator.processed_data("FI")
+
+            await measure(f"processed_data {label}", rounds, processed, report)
+
+            # like sensor.async_setup_entry, tariff sensors only exist with a tariff
+            sensors = [
+                EntsoeSensor(coordinator, description)
+                for description in SENSOR_TYPES
+                if not description.tariff
+            ]
+
+            async def update_sensors():
+                for sensor in sensors:
+                    await sensor.async_update()
+
+            await measure(
+                f"{len(sensors)} sensor updates {label}", rounds, update_sensors, report
+            )
+            requests = stand_in.requests
+            payload = stand_in.bytes
+            await coordinator.async_shutdown()
+            await stand_in.stop()
+            print(f"{label}: {requests} requests, {payload / requests / 1024:.1f} KiB per response")
+
+        await hass.async_stop(force=True)
+
+    print(f"\n{'step':<40} {'median ms':>10} {'max ms':>10} {'alloc KiB':>10} {'peak KiB':>10}")
+    for name, median, worst, allocated, peak in report:
+        print(
+            f"{name:<40} {median:>10.3f} {worst:>10.3f} {allocated / 1024:>10.1f} {peak / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    asyncio.run(run(parser.parse_args().rounds))
@@ -0,0 +1,364 @@
+"""Replay recorded ENTSO-e responses through the coordinator and sensors under a virtual clock.
+
+Runs EntsoeHub, EntsoeCoordinator and every EntsoeSensor against a local
+stand-in for the API serving the responses in a directory, while time is
+simulated: refreshes and slot ticks run back to back at their scheduled
+virtual times, so weeks pass in seconds. Each market day's prices are only
+served once they are published (the day before, Brussels time), and API
+outages answer HTTP 503, so DST days, the midnight rollover, late
+publication and degraded mode can be checked without waiting for them.
+
+The directory holds one Publication_MarketDocument per zone code and market
+day, named like `FI_2023-10-29.xml`, e.g. saved API responses. With
+`--synthesize`, missing days are generated like the benchmark does.
+
+Reports per-tick latency, state writes, and API calls made and avoided.
+Needs Home Assistant installed; run from the repository root:
+
+    python scripts/replay.py recordings --zone FI --start 2023-10-23 --days 14 --synthesize
+    python scripts/replay.py recordings --zone PT --days 3 --synthesize  # west of CET
+    python scripts/replay.py recordings --zone SE_3 --late 2023-10-28=90 \\
+        --outage 2023-10-30T11:00/2023-10-30T16:00
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+import heapq
+from itertools import count
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HassJob, HomeAssistant  # noqa: E402
+from homeassistant.helpers import event  # noqa: E402
+from homeassistant.util import dt  # noqa: E402
+
+from benchmark import API_KEY, EIC_AREA, NS, StandIn, price_document  # noqa: E402
+from custom_components.entsoe.client import EntsoeClient  # noqa: E402
+from custom_components.entsoe.const import (  # noqa: E402
+    AREA_INFO,
+    DEFAULT_PERCENTILES,
+    PUBLICATION_EXPECTED,
+    PUBLICATION_TZ,
+    SENSOR_TYPES,
+    TZ_INFO,
+    stats_descriptions,
+)
+from custom_components.entsoe.coordinator import EntsoeCoordinator  # noqa: E402
+from custom_components.entsoe.hub import EntsoeHub  # noqa: E402
+from custom_components.entsoe.limiter import EntsoeLimiter, TokenBucket  # noqa: E402
+from custom_components.entsoe.sensor import EntsoeSensor  # noqa: E402
+
+PUBLICATION = ZoneInfo(PUBLICATION_TZ)
+NO_DATA = (
+    '<?xml version="1.0" encoding="UTF-8"?><Acknowledgement_MarketDocument>'
+    "<Reason><code>999</code><text>No matching data found</text></Reason>"
+    "</Acknowledgement_MarketDocument>"
+).encode()
+
+
+class VirtualClock:
+    """Simulated UTC time with the point-in-time timers scheduled against it."""
+
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+        self._timers: list = []
+        self._order = count()
+
+    def utcnow(self) -> datetime:
+        return self.now
+
+    def local_now(self, time_zone=None) -> datetime:
+        return self.now.astimezone(time_zone or dt.DEFAULT_TIME_ZONE)
+
+    def track_point_in_utc_time(self, hass, action, point_in_time: datetime):
+        """Stand-in for event.async_track_point_in_utc_time."""
+        timer = [point_in_time, next(self._order), action, False]
+        heapq.heappush(self._timers, timer)
+
+        def cancel() -> None:
+            timer[3] = True
+
+        return cancel
+
+    def next_timer(self) -> datetime | None:
+        while self._timers and self._timers[0][3]:
+            heapq.heappop(self._timers)
+        return self._timers[0][0] if self._timers else None
+
+    def fire_next(self) -> None:
+        when, _, action, _ = heapq.heappop(self._timers)
+        target = action.target if isinstance(action, HassJob) else action
+        target(when)
+
+
+class ReplayStandIn(StandIn):
+    """Local ENTSO-e API serving recorded market days once they are published."""
+
+    def __init__(self, directory: Path, clock: VirtualClock, late, outages) -> None:
+        super().__init__()
+        self.directory = directory
+        self.clock = clock
+        self.late = late
+        self.outages = outages
+        self.unavailable = 0
+
+    def published(self, day: date) -> datetime:
+        """Return when the prices of a market day are published."""
+        expected = datetime.combine(
+            day - timedelta(days=1), PUBLICATION_EXPECTED, tzinfo=PUBLICATION
+        )
+        return expected + timedelta(minutes=self.late.get(day, 0))
+
+    async def handle(self, request: web.Request) -> web.Response:
+        now = self.clock.now
+        if any(start <= now < end for start, end in self.outages):
+            self.unavailable += 1
+            return web.Response(status=503, text="Service Unavailable")
+        self.requests += 1
+        area = EIC_AREA[request.query["in_Domain"]]
+        start = datetime.strptime(request.query["periodStart"], "%Y%m%d%H%M")
+        end = datetime.strptime(request.query["periodEnd"], "%Y%m%d%H%M")
+        day = start.replace(tzinfo=timezone.utc).astimezone(PUBLICATION).date()
+        last = end.replace(tzinfo=timezone.utc).astimezone(PUBLICATION).date()
+        series = []
+        while day <= last:
+            path = self.directory / f"{area}_{day.isoformat()}.xml"
+            if path.exists() and self.published(day) <= now:
+                document = path.read_text(encoding="utf-8")
+                first = document.find("<TimeSeries")
+                if first >= 0:
+                    series.append(document[first : document.rfind("</TimeSeries>") + 13])
+            day += timedelta(days=1)
+        body = (
+            (
+                f'<?xml version="1.0" encoding="UTF-8"?><Publication_MarketDocument xmlns="{NS}">'
+                + "".join(series)
+                + "</Publication_MarketDocument>"
+            ).encode()
+            if series
+            else NO_DATA
+        )
+        self.bytes += len(body)
+        return web.Response(body=body, content_type="application/xml")
+
+
+def synthesize(directory: Path, areas, first: date, last: date, resolution: int) -> int:
+    """Write generated market days that are missing from the directory."""
+    written = 0
+    directory.mkdir(parents=True, exist_ok=True)
+    day = first
+    while day <= last:
+        for area in areas:
+            path = directory / f"{area}_{day.isoformat()}.xml"
+            if not path.exists():
+                path.write_bytes(price_document(area, day, day, resolution))
+                written += 1
+        day += timedelta(days=1)
+    return written
+
+
+def _window(value: str) -> tuple[datetime, datetime]:
+    start, _, end = value.partition("/")
+    return (
+        dt.as_utc(datetime.fromisoformat(start).replace(tzinfo=PUBLICATION)),
+        dt.as_utc(datetime.fromisoformat(end).replace(tzinfo=PUBLICATION)),
+    )
+
+
+def _late(value: str) -> tuple[date, int]:
+    day, _, minutes = value.partition("=")
+    return date.fromisoformat(day), int(minutes)
+
+
+def _timezone_key(zone: str) -> str | None:
+    """Return the TZ_INFO key of a zone, SE_3 and the like going by their country."""
+    for key in (zone, zone.split("_")[0]):
+        if key in TZ_INFO:
+            return key
+    return None
+
+
+def _latencies(label: str, timings: list[float]) -> str:
+    if not timings:
+        return f"{label:<10} {0:>7}"
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return (
+        f"{label:<10} {len(timings):>7} {statistics.median(timings) * 1000:>10.3f}"
+        f" {p95 * 1000:>10.3f} {timings[-1] * 1000:>10.3f}"
+    )
+
+
+async def replay(args) -> None:
+    codes = list(dict.fromkeys(AREA_INFO[zone]["code"] for zone in args.zone))
+    timezone_key = args.timezone
+    tz = ZoneInfo(TZ_INFO[timezone_key]["timezone"])
+    first_day = date.fromisoformat(args.start)
+    last_day = first_day + timedelta(days=args.days)
+    directory = Path(args.directory)
+    if args.synthesize:
+        written = synthesize(
+            directory,
+            codes,
+            first_day - timedelta(days=1),
+            last_day + timedelta(days=1),
+            args.synthetic_resolution,
+        )
+        print(f"Synthesized {written} market days into {directory}")
+
+    random.seed(args.seed)
+    start = dt.as_utc(datetime.combine(first_day, time(), tzinfo=tz))
+    end = dt.as_utc(datetime.combine(last_day, time(), tzinfo=tz))
+    clock = VirtualClock(start)
+    stand_in = ReplayStandIn(
+        directory, clock, dict(args.late or []), args.outage or []
+    )
+
+    with tempfile.TemporaryDirectory() as config_dir, patch.object(
+        dt, "utcnow", clock.utcnow
+    ), patch.object(dt, "now", clock.local_now), patch.object(
+        event, "async_track_point_in_utc_time", clock.track_point_in_utc_time
+    ):
+        hass = HomeAssistant(config_dir)
+        await stand_in.start()
+
+        limiter = EntsoeLimiter(hass)
+        # the stand-in has no request budget, don't spend real time in the token bucket
+        limiter.bucket = TokenBucket(1e9, 1000)
+        hubs = {}
+        for code in codes:
+            hub = hubs[code] = EntsoeHub(hass, API_KEY, code, 7, limiter)
+            hub.client = EntsoeClient(hub.client._session, API_KEY, stand_in.url)
+            hub.subscribe(TZ_INFO[timezone_key]["timezone"])
+            await hub.async_load()
+
+        coordinator = EntsoeCoordinator(
+            hass, hubs=hubs, timezone=timezone_key, resolution=args.resolution
+        )
+        # refreshes are driven by the replay loop at virtual times, not by the event loop
+        coordinator._schedule_refresh = lambda: None
+
+        writes = 0
+
+        def count_write() -> None:
+            nonlocal writes
+            writes += 1
+
+        sensors = []
+        for code in codes:
+            for description in SENSOR_TYPES + stats_descriptions(DEFAULT_PERCENTILES):
+                if description.tariff:
+                    continue
+                sensor = EntsoeSensor(coordinator, description, "", code)
+                sensor.async_write_ha_state = count_write
+                coordinator.async_add_listener(sensor._handle_coordinator_update)
+                sensors.append(sensor)
+
+        days: dict[tuple[str, date], list] = {}
+
+        def watch_days() -> None:
+            """Note each local day's slot count and when its successor's prices arrived."""
+            for code, zone in (coordinator.data or {}).items():
+                row = days.setdefault((code, zone["day"]), [len(zone["dataToday"]), None])
+                row[0] = max(row[0], len(zone["dataToday"]))
+                if row[1] is None and len(zone["dataTomorrow"]):
+                    row[1] = clock.now
+
+        coordinator.async_add_listener(watch_days)
+
+        refresh_times: list[float] = []
+        tick_times: list[float] = []
+        failed_refreshes = 0
+        next_refresh_at = start
+        began = perf_counter()
+        while clock.now < end:
+            timer = clock.next_timer()
+            if timer is None or next_refresh_at <= timer:
+                clock.now = max(clock.now, next_refresh_at)
+                begin = perf_counter()
+                await coordinator.async_refresh()
+                refresh_times.append(perf_counter() - begin)
+                if not coordinator.last_update_success:
+                    failed_refreshes += 1
+                # never refresh twice at the same virtual time, that would loop forever
+                next_refresh_at = clock.now + max(
+                    coordinator.update_interval, timedelta(seconds=1)
+                )
+            else:
+                clock.now = max(clock.now, timer)
+                begin = perf_counter()
+                clock.fire_next()
+                tick_times.append(perf_counter() - begin)
+        elapsed = perf_counter() - began
+
+        await coordinator.async_shutdown()
+        await stand_in.stop()
+        await hass.async_stop(force=True)
+
+    simulated = end - start
+    hours = simulated.total_seconds() / 3600
+    cache_hits = sum(hub.metrics.cache_hits for hub in hubs.values())
+    breaker_avoided = sum(hub.metrics.requests_avoided for hub in hubs.values())
+    hourly_polls = int(hours) * len(codes)
+    print(
+        f"\nReplayed {simulated.days} days of {', '.join(codes)} in {elapsed:.2f} s"
+        f" ({simulated.total_seconds() / elapsed:,.0f}x)\n"
+    )
+    print(f"{'step':<10} {'count':>7} {'median ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    print(_latencies("refresh", refresh_times))
+    print(_latencies("tick", tick_times))
+    print(f"\nfailed refreshes              {failed_refreshes:>8}")
+    print(f"state writes                  {writes:>8}")
+    print(f"  per sensor and day          {writes / len(sensors) / max(hours / 24, 1):>8.1f}")
+    print(f"API requests                  {stand_in.requests:>8}")
+    print(f"  answered 503 (outage)       {stand_in.unavailable:>8}")
+    print(f"  served from the archive     {cache_hits:>8}")
+    print(f"  avoided by the breaker      {breaker_avoided:>8}")
+    print(
+        f"  avoided vs hourly polling   {hourly_polls - stand_in.requests - stand_in.unavailable:>8}"
+    )
+
+    print(f"\n{'zone':<8} {'local day':<12} {'slots':>6}  tomorrow's prices from")
+    for (code, day), (slots, tomorrow) in sorted(days.items()):
+        arrived = tomorrow.astimezone(tz).strftime("%Y-%m-%d %H:%M") if tomorrow else "-"
+        print(f"{code:<8} {day.isoformat():<12} {slots:>6}  {arrived}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="directory of recorded responses")
+    parser.add_argument("--zone", action="append", required=True, choices=list(AREA_INFO))
+    parser.add_argument(
+        "--timezone", choices=list(TZ_INFO), help="defaults to the first zone's country"
+    )
+    parser.add_argument("--start", default="2023-10-23", help="first local day, YYYY-MM-DD")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--resolution", default="native", choices=("native", "PT15M", "PT60M"))
+    parser.add_argument(
+        "--late", action="append", type=_late, metavar="YYYY-MM-DD=MINUTES",
+        help="publish the market day this many minutes after 13:00 Brussels time",
+    )
+    parser.add_argument(
+        "--outage", action="append", type=_window, metavar="START/END",
+        help="answer HTTP 503 between two Brussels times, e.g. 2023-10-30T11:00/2023-10-30T16:00",
+    )
+    parser.add_argument("--synthesize", action="store_true", help="generate missing market days")
+    parser.add_argument("--synthetic-resolution", type=int, default=3600, choices=(900, 3600))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the refresh jitter")
+    args = parser.parse_args()
+    args.timezone = args.timezone or _timezone_key(args.zone[0])
+    if args.timezone is None:
+        parser.error(f"no time zone known for {args.zone[0]}, pass --timezone")
+    asyncio.run(replay(args))
@@ -0,0 +1 @@
+"""Tests for the ENTSO-e prices component."""
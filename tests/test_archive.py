@@ -0,0 +1,62 @@
+"""Tests for the persistent price archive."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from custom_components.entsoe.archive import PriceArchive
+from custom_components.entsoe.series import PriceSeries
+
+
+SECOND = timedelta(seconds=1)
+
+
+def _today() -> int:
+    return int(dt.start_of_local_day().timestamp())
+
+
+async def test_missing_ranges(hass: HomeAssistant) -> None:
+    """Holes and the unknown end of the window are missing, each as one range."""
+    archive = PriceArchive(hass, "FI", 7)
+    start = _today()
+    archive.add(PriceSeries(start, 3600, array("d", [1, 2, float("nan"), 4])))
+    archive.add(PriceSeries(start + 3 * 3600, 3600, array("d", [4])))
+
+    def at(hours: float) -> datetime:
+        return dt.utc_from_timestamp(start + int(hours * 3600))
+
+    assert archive.missing(at(0), at(6) - SECOND) == [
+        (at(2), at(3) - SECOND),
+        (at(4), at(6) - SECOND),
+    ]
+    assert archive.missing(at(0), at(2) - SECOND) == []
+
+
+async def test_missing_after_switch_to_quarters(hass: HomeAssistant) -> None:
+    """Hours archived before a switch to 15 minute prices aren't requested again."""
+    archive = PriceArchive(hass, "FI", 7)
+    start = _today()
+    archive.add(PriceSeries(start, 3600, array("d", [1, 2])))
+    archive.add(PriceSeries(start + 7200, 900, array("d", [3, 3, 3, 3])))
+
+    assert archive.resolution == 900
+    end = dt.utc_from_timestamp(start + 4 * 3600 - 1)
+    assert archive.missing(dt.utc_from_timestamp(start), end) == [
+        (dt.utc_from_timestamp(start + 3 * 3600), end)
+    ]
+    assert len(archive.series(dt.utc_from_timestamp(start), end)) == 12
+
+
+async def test_prune_keeps_whole_local_days(hass: HomeAssistant) -> None:
+    """Prices from before the first kept local day are forgotten."""
+    archive = PriceArchive(hass, "FI", 2)
+    oldest = int((dt.start_of_local_day() - timedelta(days=2)).timestamp())
+    start = oldest - 5 * 3600
+    archive.add(PriceSeries(start, 3600, array("d", range(5 + 3 * 24))))
+
+    series = archive.full_series()
+    assert series.start == oldest
+    assert len(series) == 3 * 24
@@ -0,0 +1,78 @@
+"""Tests for the ENTSO-e API client."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from custom_components.entsoe.client import (
+    EntsoeClient,
+    PriceDocumentParser,
+    merge_resolutions,
+)
+from custom_components.entsoe.const import API_URL
+
+NS = "urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3"
+
+
+def _period(start: str, end: str, resolution: str, prices: list[float]) -> str:
+    points = "".join(
+        f"<Point><position>{position}</position><price.amount>{price}</price.amount></Point>"
+        for position, price in enumerate(prices, 1)
+    )
+    return (
+        "<TimeSeries><curveType>A01</curveType><Period><timeInterval>"
+        f"<start>{start}</start><end>{end}</end></timeInterval>"
+        f"<resolution>{resolution}</resolution>{points}</Period></TimeSeries>"
+    )
+
+
+# the day before and the day of a zone's switch from hourly to 15 minute prices
+MIXED_DOCUMENT = (
+    f'<?xml version="1.0" encoding="UTF-8"?><Publication_MarketDocument xmlns="{NS}">'
+    + _period("2025-09-30T22:00Z", "2025-10-01T22:00Z", "PT60M", list(range(24)))
+    + _period("2025-10-01T22:00Z", "2025-10-02T22:00Z", "PT15M", [100 + q for q in range(96)])
+    + "</Publication_MarketDocument>"
+).encode()
+
+FIRST = int(datetime(2025, 9, 30, 22, tzinfo=timezone.utc).timestamp())
+
+
+def test_parser_keeps_every_resolution() -> None:
+    """Both the hourly and the 15 minute periods are parsed."""
+    parser = PriceDocumentParser()
+    parser.feed(MIXED_DOCUMENT)
+    parser.close()
+    assert {resolution: len(points) for resolution, points in parser.points.items()} == {
+        3600: 24,
+        900: 96,
+    }
+
+
+def test_merge_resolutions_expands_coarser_periods() -> None:
+    """Hourly prices are repeated per quarter instead of being dropped."""
+    parser = PriceDocumentParser()
+    parser.feed(MIXED_DOCUMENT)
+    parser.close()
+    resolution, points = merge_resolutions(parser.points)
+    assert resolution == 900
+    assert len(points) == 24 * 4 + 96
+    assert [points[FIRST + quarter * 900] for quarter in range(8)] == [0] * 4 + [1] * 4
+    assert points[FIRST + 24 * 3600] == 100
+
+
+async def test_client_returns_mixed_resolution_day(hass, aioclient_mock) -> None:
+    """A document spanning the switch comes back as one 15 minute series."""
+    aioclient_mock.get(
+        API_URL, content=MIXED_DOCUMENT, headers={"Content-Type": "application/xml"}
+    )
+    session = aioclient_mock.create_session(hass.loop)
+    client = EntsoeClient(session, "key")
+    series = await client.query_day_ahead_prices(
+        "FI",
+        datetime(2025, 9, 30, 22, tzinfo=timezone.utc),
+        datetime(2025, 10, 2, 21, 59, tzinfo=timezone.utc),
+    )
+    await session.close()
+    assert series.resolution == 900
+    assert series.start == FIRST
+    assert len(series) == series.count() == 192
+    assert series.values[4] == 1
@@ -0,0 +1,49 @@
+"""Tests for the columnar price files."""
+from __future__ import annotations
+
+from array import array
+import math
+
+from custom_components.entsoe.columnar import ColumnarPriceFile
+from custom_components.entsoe.series import PriceSeries
+
+DAY = 1698019200  # 2023-10-23T00:00Z
+
+
+def test_missing_slot_published_late(tmp_path) -> None:
+    """A slot missing when the day was written is merged in when it arrives."""
+    prices = ColumnarPriceFile(str(tmp_path / "FI.prices"))
+    values = array("d", range(24))
+    values[5] = math.nan
+    assert prices.append(PriceSeries(DAY, 3600, values)) == 23
+
+    assert prices.append(PriceSeries(DAY, 3600, array("d", range(24)))) == 1
+    rows = list(prices.rows())
+    assert [row[0] for row in rows] == [DAY + hour * 3600 for hour in range(24)]
+    assert rows[5] == (DAY + 5 * 3600, 3600, 5.0)
+
+
+def test_day_appended_out_of_order(tmp_path) -> None:
+    """An earlier day appended after a later one ends up in time order."""
+    prices = ColumnarPriceFile(str(tmp_path / "FI.prices"))
+    prices.append(PriceSeries(DAY + 86400, 3600, array("d", [2.0] * 24)))
+    assert prices.append(PriceSeries(DAY, 3600, array("d", [1.0] * 24))) == 24
+    rows = list(prices.rows())
+    assert len(rows) == 48
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+    assert list(prices.rows(DAY + 86400 - 3600, DAY + 86400 + 1)) == [
+        (DAY + 86400 - 3600, 3600, 1.0),
+        (DAY + 86400, 3600, 2.0),
+    ]
+    # a new file picks up where the merged one ends
+    assert ColumnarPriceFile(prices.path).append(
+        PriceSeries(DAY + 2 * 86400, 3600, array("d", [3.0]))
+    ) == 1
+
+
+def test_stored_slots_are_kept(tmp_path) -> None:
+    """Quarters of a stored hour, as the archive repeats it, don't split it."""
+    prices = ColumnarPriceFile(str(tmp_path / "FI.prices"))
+    prices.append(PriceSeries(DAY, 3600, array("d", [1.0, 2.0])))
+    assert prices.append(PriceSeries(DAY, 900, array("d", [1.0] * 4 + [2.5] * 4))) == 0
+    assert list(prices.rows()) == [(DAY, 3600, 1.0), (DAY + 3600, 3600, 2.0)]
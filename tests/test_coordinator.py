@@ -0,0 +1,40 @@
+"""Tests for the coordinator."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.entsoe.client import EntsoeUnavailableError
+from custom_components.entsoe.coordinator import EntsoeCoordinator
+
+
+def _failing_hub() -> SimpleNamespace:
+    return SimpleNamespace(
+        async_get_prices=AsyncMock(side_effect=EntsoeUnavailableError("unavailable")),
+        next_poll=lambda when: when,
+    )
+
+
+async def test_first_refresh_failing_sets_up_without_data(hass: HomeAssistant) -> None:
+    """The entry loads without data, so its entities restore their last state."""
+    coordinator = EntsoeCoordinator(hass, hubs={"FI": _failing_hub()}, timezone="FI")
+    await coordinator.async_config_entry_first_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.data is None
+    # retried with backoff
+    assert coordinator._failures == 1
+    await coordinator.async_shutdown()
+
+
+async def test_refresh_failing_without_usable_data(hass: HomeAssistant) -> None:
+    """Later refreshes without any current stored data fail."""
+    coordinator = EntsoeCoordinator(hass, hubs={"FI": _failing_hub()}, timezone="FI")
+    coordinator.data = {}
+    with pytest.raises(UpdateFailed):
+        await coordinator.fetch_prices()
+    await coordinator.async_shutdown()
@@ -0,0 +1,89 @@
+"""Tests for the per-zone hub."""
+from __future__ import annotations
+
+from array import array
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from custom_components.entsoe.client import EntsoeAuthError, EntsoeUnavailableError
+from custom_components.entsoe.hub import EntsoeHub
+from custom_components.entsoe.limiter import EntsoeLimiter
+from custom_components.entsoe.series import PriceSeries
+
+
+async def test_entries_join_the_earliest_poll(hass: HomeAssistant) -> None:
+    """An entry wanting to poll later joins the poll scheduled for the zone."""
+    hub = EntsoeHub(hass, "key", "FI", 7, EntsoeLimiter(hass))
+    now = dt.utcnow()
+
+    first = hub.next_poll(now + timedelta(minutes=3))
+    assert first == now + timedelta(minutes=3)
+    assert hub.next_poll(now + timedelta(minutes=4)) == first
+    # an earlier poll isn't delayed, it becomes the one to join
+    earlier = hub.next_poll(now + timedelta(minutes=2))
+    assert earlier == now + timedelta(minutes=2)
+    assert hub.next_poll(now + timedelta(minutes=3)) == earlier
+    # a poll in the past was made, it isn't joined anymore
+    hub._next_poll = now - timedelta(seconds=1)
+    assert hub.next_poll(now + timedelta(minutes=5)) == now + timedelta(minutes=5)
+
+
+def _archived_today(hass: HomeAssistant) -> EntsoeHub:
+    """Return a Helsinki hub whose fetches fail."""
+    hub = EntsoeHub(hass, "key", "FI", 7, EntsoeLimiter(hass))
+    hub.subscribe("Europe/Helsinki")
+    hub.limiter.async_request = AsyncMock(
+        side_effect=EntsoeUnavailableError("ENTSO-e is temporarily unavailable")
+    )
+    return hub
+
+
+async def test_failed_gap_fetch_serves_the_archive(hass: HomeAssistant) -> None:
+    """Tomorrow failing to fetch doesn't lose today's archived prices."""
+    hub = _archived_today(hass)
+    start, _ = hub.window()
+    start = int(start.timestamp())
+    hub.archive.add(PriceSeries(start, 3600, array("d", range(24))))
+
+    series = await hub.async_get_prices()
+    assert series.start == start
+    assert len(series) == 24
+    assert hub.metrics.last_failure_reason.startswith("EntsoeUnavailableError")
+
+
+async def test_failed_fetch_without_archive_raises(hass: HomeAssistant) -> None:
+    """With nothing archived for now the failure is raised."""
+    hub = _archived_today(hass)
+    with pytest.raises(EntsoeUnavailableError):
+        await hub.async_get_prices()
+
+
+async def test_entries_share_the_latest_api_key(hass: HomeAssistant) -> None:
+    """A reloaded entry's new key is used, and a removed key is replaced."""
+    hub = EntsoeHub(hass, "first", "FI", 7, EntsoeLimiter(hass))
+    hub.subscribe("Europe/Helsinki", "first")
+    hub.subscribe("Europe/Helsinki", "second")
+    assert hub.client._api_key == "second"
+
+    hub.unsubscribe("Europe/Helsinki", "second")
+    assert hub.client._api_key == "first"
+    hub.subscribe("Europe/Helsinki", "changed")
+    hub.unsubscribe("Europe/Helsinki", "first")
+    assert hub.client._api_key == "changed"
+
+
+async def test_rejected_api_key_is_replaced(hass: HomeAssistant) -> None:
+    """An invalid key doesn't keep failing the entries that have a valid one."""
+    hub = EntsoeHub(hass, "valid", "FI", 7, EntsoeLimiter(hass))
+    hub.subscribe("Europe/Helsinki", "valid")
+    hub.subscribe("Europe/Helsinki", "invalid")
+    hub.limiter.async_request = AsyncMock(side_effect=EntsoeAuthError("Invalid key"))
+
+    with pytest.raises(EntsoeAuthError):
+        await hub.async_get_prices()
+    assert hub.client._api_key == "valid"
@@ -0,0 +1,112 @@
+"""Tests for the request limiter and circuit breakers."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from custom_components.entsoe.client import EntsoeCircuitOpenError, EntsoeError
+from custom_components.entsoe.limiter import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    EntsoeLimiter,
+    async_get_limiter,
+)
+
+
+def _due_breaker() -> CircuitBreaker:
+    """Return an open breaker whose cooldown has passed."""
+    return CircuitBreaker(STATE_OPEN, 3, dt.utcnow() - timedelta(seconds=1), 120.0)
+
+
+def test_half_open_lets_one_trial_through() -> None:
+    """Only the first caller after the cooldown is let through."""
+    breaker = _due_breaker()
+    now = dt.utcnow()
+    assert breaker.allow(now)
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow(now)
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow(now) and breaker.allow(now)
+
+
+async def test_concurrent_callers_during_trial(hass: HomeAssistant) -> None:
+    """Callers arriving while the trial is in flight are refused."""
+    limiter = EntsoeLimiter(hass)
+    limiter.breakers["FI"] = _due_breaker()
+    answer = asyncio.Event()
+
+    async def trial() -> str:
+        await answer.wait()
+        return "prices"
+
+    pending = asyncio.ensure_future(limiter.async_request("FI", trial))
+    await asyncio.sleep(0)
+    with pytest.raises(EntsoeCircuitOpenError):
+        await limiter.async_request("FI", trial)
+    answer.set()
+    assert await pending == "prices"
+    assert limiter.breakers["FI"].state == STATE_CLOSED
+
+
+async def test_any_trial_failure_reopens(hass: HomeAssistant) -> None:
+    """A trial failing on a non-transient error opens the breaker again."""
+    limiter = EntsoeLimiter(hass)
+    limiter.breakers["FI"] = _due_breaker()
+
+    async def malformed() -> None:
+        raise EntsoeError("Unparsable document")
+
+    with pytest.raises(EntsoeError):
+        await limiter.async_request("FI", malformed)
+    breaker = limiter.breakers["FI"]
+    assert breaker.state == STATE_OPEN
+    assert breaker.cooldown == 240.0
+    assert not breaker.allow(dt.utcnow())
+
+
+async def test_cancelled_trial_is_released(hass: HomeAssistant) -> None:
+    """A trial cancelled before its answer lets the next caller try."""
+    limiter = EntsoeLimiter(hass)
+    limiter.breakers["FI"] = _due_breaker()
+
+    pending = asyncio.ensure_future(
+        limiter.async_request("FI", asyncio.Event().wait)
+    )
+    await asyncio.sleep(0)
+    pending.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    assert limiter.breakers["FI"].allow(dt.utcnow())
+
+
+async def test_concurrent_first_use_waits_for_load(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Every caller gets the limiter with its stored breakers loaded."""
+    open_until = (dt.utcnow() + timedelta(minutes=5)).isoformat()
+    hass_storage["entsoe.limiter"] = {
+        "version": 1,
+        "key": "entsoe.limiter",
+        "data": {
+            "breakers": {
+                "FI": {"state": STATE_OPEN, "failures": 3, "open_until": open_until}
+            }
+        },
+    }
+
+    async def breaker_state() -> str:
+        limiter = await async_get_limiter(hass)
+        return limiter.breaker("FI").state
+
+    assert await asyncio.gather(breaker_state(), breaker_state()) == [
+        STATE_OPEN,
+        STATE_OPEN,
+    ]
@@ -0,0 +1,76 @@
+"""Tests for the appliance start time optimizer."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timezone
+import math
+
+import pytest
+
+from custom_components.entsoe.optimizer import optimize_start
+from custom_components.entsoe.series import PriceSeries
+
+MIDNIGHT = datetime(2023, 9, 19, tzinfo=timezone.utc)
+START = int(MIDNIGHT.timestamp())
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return MIDNIGHT.replace(hour=hour, minute=minute)
+
+
+def test_cheapest_aligned_start() -> None:
+    prices = PriceSeries(START, 3600, array("d", [5, 1, 1, 9]))
+    assert optimize_start(prices, [1, 1], 3600, at(0)) == (START + 3600, 2)
+
+
+def test_non_aligned_earliest_starts_at_next_slot() -> None:
+    """A run never starts before earliest and still ends by the deadline."""
+    prices = PriceSeries(START, 3600, array("d", [1, 1, 9, 9]))
+    best = optimize_start(prices, [1, 1], 3600, at(0, 20), at(2))
+    # 00:00-02:00 would be cheapest but starts before earliest, 01:00-03:00 misses the deadline
+    assert best is None
+
+    start, cost = optimize_start(prices, [1, 1], 3600, at(0, 20), at(3))
+    assert start == START + 3600
+    assert start + 2 * 3600 <= int(at(3).timestamp())
+    assert cost == 10
+
+
+def test_non_aligned_earliest_with_finer_profile() -> None:
+    """A 15 minute profile may start at the next quarter within the hour."""
+    prices = PriceSeries(START, 3600, array("d", [1, 1, 9, 9]))
+    start, cost = optimize_start(prices, [1, 1], 900, at(0, 20), at(2))
+    assert start == START + 1800
+    assert cost == 2
+
+
+def _brute_force(prices: PriceSeries, weights: list[float]) -> tuple[int, float]:
+    costs = [
+        sum(kwh * prices.values[start + offset] for offset, kwh in enumerate(weights))
+        for start in range(len(prices.values) - len(weights) + 1)
+    ]
+    best = min(range(len(costs)), key=costs.__getitem__)
+    return prices.start + best * prices.resolution, costs[best]
+
+
+def test_long_profile_matches_the_slot_by_slot_cost() -> None:
+    """A run over most of two days of quarter-hourly prices, with a missing price."""
+    values = array("d", [(slot * 37) % 101 / 10 for slot in range(192)])
+    profile = [2.0] * 40 + [0.5] * 60 + [1.0, 3.0] * 10
+    prices = PriceSeries(START, 900, values)
+    start, cost = optimize_start(prices, profile, 900, at(0))
+    expected_start, expected_cost = _brute_force(prices, profile)
+    assert start == expected_start
+    assert cost == pytest.approx(expected_cost)
+
+    values[60] = math.nan
+    start, _ = optimize_start(PriceSeries(START, 900, values), profile, 900, at(0))
+    assert start > START + 60 * 900
+
+
+def test_constant_profile_over_minutes() -> None:
+    """A 12 hour run at minute resolution over hourly prices."""
+    prices = PriceSeries(START, 3600, array("d", [9] * 6 + [1] * 12 + [9] * 30))
+    start, cost = optimize_start(prices, [0.01] * 720, 60, at(0))
+    assert start == START + 6 * 3600
+    assert cost == pytest.approx(7.2)
@@ -0,0 +1,57 @@
+"""Tests for the precomputed price lookups."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timezone
+import math
+from zoneinfo import ZoneInfo
+
+from custom_components.entsoe.price_index import PriceIndex
+from custom_components.entsoe.series import PriceSeries
+
+START = int(datetime(2023, 9, 19, tzinfo=timezone.utc).timestamp())
+
+
+def slot(index: int) -> datetime:
+    return datetime.fromtimestamp(START + index * 3600, timezone.utc)
+
+
+def test_ranks_within_local_days() -> None:
+    """Slots rank within their own local day, all 25 of the DST day."""
+    helsinki = ZoneInfo("Europe/Helsinki")
+    start = int(datetime(2023, 10, 28, tzinfo=helsinki).timestamp())
+    series = PriceSeries(start, 3600, array("d", [100 - hour for hour in range(49)]))
+    index = PriceIndex(series, helsinki, ())
+
+    assert index.ranks[23] == 1 and index.ranks[0] == 24
+    assert index.ranks[48] == 1 and index.ranks[24] == 25
+
+    series.values[48] = math.nan
+    index = PriceIndex(series, helsinki, ())
+    assert index.ranks[47] == 1
+    assert index.rank(datetime.fromtimestamp(start + 48 * 3600, timezone.utc)) is None
+
+
+def test_best_blocks_from_the_running_slot_on() -> None:
+    """Blocks holding a missing price are skipped, as are incomplete ones at the end."""
+    series = PriceSeries(START, 3600, array("d", [5, 1, 1, 9, math.nan, 0, 0, 9]))
+    index = PriceIndex(series, timezone.utc, (2,))
+
+    assert index.cheapest_start(2, slot(0)) == slot(5)
+    assert index.cheapest_start(2, slot(6)) == slot(6)
+    assert index.cheapest_start(2, slot(7)) is None
+    assert index.most_expensive_start(2, slot(0)) == slot(2)
+    assert index.most_expensive_start(2, slot(3)) == slot(6)
+    # windows that weren't indexed, and times outside the series
+    assert index.cheapest_start(3, slot(0)) is None
+    assert index.cheapest_start(2, slot(8)) is None
+
+
+def test_cheapest_slots_before_a_time() -> None:
+    """The cheapest slots needn't be consecutive, and are returned in time order."""
+    series = PriceSeries(START, 3600, array("d", [5, 1, 1, 9, math.nan, 0, 0, 9]))
+    index = PriceIndex(series, timezone.utc, ())
+
+    assert index.cheapest_slots(2, now=slot(1)) == [slot(5), slot(6)]
+    assert index.cheapest_slots(2, before=slot(6), now=slot(1)) == [slot(1), slot(5)]
+    assert index.cheapest_slots(1.5, now=slot(0)) == [slot(5), slot(6)]
@@ -0,0 +1,45 @@
+"""Tests for the price sensors."""
+from __future__ import annotations
+
+from array import array
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockEntityPlatform
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from homeassistant.util import dt
+
+from custom_components.entsoe.const import SENSOR_TYPES
+from custom_components.entsoe.coordinator import EntsoeCoordinator
+from custom_components.entsoe.sensor import EntsoeSensor
+from custom_components.entsoe.series import PriceSeries
+
+
+def _prices(coordinator: EntsoeCoordinator, current: float) -> dict:
+    """Return coordinator data of hourly FI prices from yesterday on."""
+    now = int(dt.utcnow().timestamp())
+    prices = array("d", [10.0] * 72)
+    prices[24] = current
+    return {"FI": coordinator.split_days(PriceSeries(now - now % 3600 - 86400, 3600, prices))}
+
+
+async def test_unchanged_tick_after_first_write(hass: HomeAssistant) -> None:
+    """The first tick after adding the sensor doesn't rewrite its state."""
+    coordinator = EntsoeCoordinator(
+        hass, hubs={"FI": SimpleNamespace(metrics=None)}, timezone="FI"
+    )
+    coordinator.data = _prices(coordinator, 20.0)
+    description = next(d for d in SENSOR_TYPES if d.key == "current_price")
+    sensor = EntsoeSensor(coordinator, description)
+    await MockEntityPlatform(hass).async_add_entities([sensor], update_before_add=True)
+    assert float(hass.states.get(sensor.entity_id).state) == 20.0
+
+    with patch.object(Entity, "async_write_ha_state") as write:
+        coordinator.async_update_listeners()
+        write.assert_not_called()
+
+    coordinator.async_set_updated_data(_prices(coordinator, 30.0))
+    assert float(hass.states.get(sensor.entity_id).state) == 30.0
+    await coordinator.async_shutdown()
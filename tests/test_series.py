@@ -0,0 +1,45 @@
+"""Tests for the price series and the local day partition."""
+from __future__ import annotations
+
+from array import array
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from custom_components.entsoe.scheduler import market_day_end
+from custom_components.entsoe.series import DayPartition, PriceSeries
+
+MARKET_TZ = ZoneInfo("Europe/Brussels")
+
+
+def published_days(first: date, days: int) -> PriceSeries:
+    """Return hourly prices of whole market days, as ENTSO-e publishes them."""
+    start = int(datetime.combine(first, datetime.min.time(), MARKET_TZ).timestamp())
+    return PriceSeries(start, 3600, array("d", range(24 * days)))
+
+
+def test_tomorrow_complete_west_of_the_market_day() -> None:
+    """Lisbon's tomorrow ends in the next, unpublished market day."""
+    partition = DayPartition(published_days(date(2023, 9, 18), 2), ZoneInfo("Europe/Lisbon"))
+    tomorrow = date(2023, 9, 19)
+    assert not partition.complete(tomorrow)
+    assert partition.complete(tomorrow, int(market_day_end(tomorrow).timestamp()))
+
+
+def test_tomorrow_complete_east_of_the_market_day() -> None:
+    """Helsinki's tomorrow lies within the published market days."""
+    series = published_days(date(2023, 9, 18), 2)
+    tomorrow = date(2023, 9, 19)
+    until = int(market_day_end(tomorrow).timestamp())
+    assert DayPartition(series, ZoneInfo("Europe/Helsinki")).complete(tomorrow, until)
+
+    series.values[-2] = float("nan")
+    assert not DayPartition(series, ZoneInfo("Europe/Helsinki")).complete(
+        tomorrow, until
+    )
+
+
+def test_dst_day_slot_count() -> None:
+    """The 25 hour day needs all of its slots."""
+    partition = DayPartition(published_days(date(2023, 10, 28), 3), MARKET_TZ)
+    assert partition.expected(date(2023, 10, 29)) == 25
+    assert partition.complete(date(2023, 10, 29))
@@ -0,0 +1,69 @@
+"""Tests for the services."""
+from __future__ import annotations
+
+import asyncio
+
+from aiohttp import ClientError
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMockResponse,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.entsoe.const import (
+    API_URL,
+    BACKFILL_CONCURRENCY,
+    CONF_API_KEY,
+    DOMAIN,
+)
+from custom_components.entsoe.services import SERVICE_BACKFILL, async_setup_services
+
+# twelve chunks of at most a month
+BACKFILL = {"area": "FI", "start_date": "2023-01-01", "end_date": "2023-12-31"}
+
+
+@pytest.fixture
+def backfill_ready(hass: HomeAssistant) -> None:
+    """Register the services with an API key and a recorder to import into."""
+    MockConfigEntry(domain=DOMAIN, options={CONF_API_KEY: "key"}).add_to_hass(hass)
+    hass.config.components.add("recorder")
+    async_setup_services(hass)
+
+
+@pytest.mark.parametrize(
+    "exc", [ClientError("Connection reset"), asyncio.TimeoutError()]
+)
+async def test_backfill_network_failure(
+    hass: HomeAssistant, aioclient_mock, backfill_ready, exc: Exception
+) -> None:
+    """Network errors fail the service call like API errors do."""
+    aioclient_mock.get(API_URL, exc=exc)
+    with pytest.raises(HomeAssistantError, match="Backfilling ENTSO-e prices failed"):
+        await hass.services.async_call(DOMAIN, SERVICE_BACKFILL, BACKFILL, blocking=True)
+
+
+async def test_backfill_failure_cancels_remaining_chunks(
+    hass: HomeAssistant, aioclient_mock, backfill_ready
+) -> None:
+    """The chunks in flight when one fails are cancelled, the waiting ones never sent."""
+    answer = asyncio.Event()
+
+    async def first_fails(method, url, data):
+        if aioclient_mock.call_count > 1:
+            # the other chunks wait until they are cancelled
+            await answer.wait()
+        # not a transient error, so the zone's breaker doesn't stop the requests
+        return AiohttpClientMockResponse(
+            method, url, 400, text="Bad request", headers={"Content-Type": "text/plain"}
+        )
+
+    aioclient_mock.get(API_URL, side_effect=first_fails)
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(DOMAIN, SERVICE_BACKFILL, BACKFILL, blocking=True)
+    answer.set()
+    await hass.async_block_till_done()
+    # the failed chunk's slot may go to the next one before the cancel
+    assert aioclient_mock.call_count <= BACKFILL_CONCURRENCY + 1
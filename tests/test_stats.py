@@ -0,0 +1,54 @@
+"""Tests for the daily price statistics."""
+from __future__ import annotations
+
+from array import array
+from datetime import date, datetime
+import math
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.entsoe.series import DayPartition, PriceSeries
+from custom_components.entsoe.stats import DayStats, day_stats
+
+BRUSSELS = ZoneInfo("Europe/Brussels")
+
+
+def dst_day(day: date) -> PriceSeries:
+    """Return the local day of a DST change, priced 0, 1, 2, ... per hour."""
+    start = int(datetime.combine(day, datetime.min.time(), BRUSSELS).timestamp())
+    series = PriceSeries(start, 3600, array("d", range(26)))
+    return DayPartition(series, BRUSSELS).day(day)
+
+
+@pytest.mark.parametrize(
+    ("day", "hours", "percentiles"),
+    [
+        (date(2023, 10, 29), 25, {10: 2.4, 25: 6.0, 90: 21.6}),
+        (date(2023, 3, 26), 23, {10: 2.2, 25: 5.5, 90: 19.8}),
+    ],
+)
+def test_percentiles_over_every_slot_of_a_dst_day(
+    day: date, hours: int, percentiles: dict[int, float]
+) -> None:
+    """Percentiles interpolate over all slots of the 23 or 25 hour day."""
+    series = dst_day(day)
+    stats = day_stats(series, BRUSSELS, (10, 25, 90))
+    assert stats.count == hours
+    assert stats.median == stats.mean == (hours - 1) / 2
+    assert stats.percentiles == pytest.approx(percentiles)
+    assert stats.min_time == datetime(day.year, day.month, day.day, tzinfo=BRUSSELS)
+    # the last slot of the day, an hour before the next local midnight
+    assert stats.max_time.timestamp() == series.end - 3600
+
+
+def test_missing_prices_are_left_out() -> None:
+    """Percentiles cover the priced slots only, a day without any has no stats."""
+    series = PriceSeries(0, 3600, array("d", [4, math.nan, 1, 3, 2]))
+    stats = day_stats(series, BRUSSELS, (50,))
+    assert stats.count == 4
+    assert stats.percentiles == {50: 2.5}
+    assert stats.std == pytest.approx(1.118)
+
+    series = PriceSeries(0, 3600, array("d", [math.nan] * 3))
+    assert day_stats(series, BRUSSELS, (50,)) == DayStats()
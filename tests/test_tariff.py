@@ -0,0 +1,62 @@
+"""Tests for the consumer price tariff."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from custom_components.entsoe.series import PriceSeries
+from custom_components.entsoe.tariff import Tariff
+
+TZ = ZoneInfo("Europe/Helsinki")
+
+
+def hourly(first: datetime, hours: int) -> PriceSeries:
+    return PriceSeries(int(first.timestamp()), 3600, array("d", [10.0] * hours))
+
+
+def fees(tariff: Tariff, first: datetime, hours: int) -> dict[int, float]:
+    """Return the fee per local hour, with the spot price of 10 taken off."""
+    final = tariff.apply(hourly(first, hours), TZ)
+    return {
+        (first + timedelta(hours=index)).astimezone(TZ).hour: round(price - 10, 3)
+        for index, price in enumerate(final.values)
+    }
+
+
+def test_day_rule() -> None:
+    tariff = Tariff(grid_fees=[{"start": "07:00", "end": "22:00", "fee": 4.5}])
+    by_hour = fees(tariff, datetime(2023, 9, 18, tzinfo=TZ), 24)
+    assert by_hour[6] == 0
+    assert by_hour[7] == by_hour[21] == 4.5
+    assert by_hour[22] == 0
+
+
+def test_overnight_rule_wraps_midnight() -> None:
+    """A 22:00-06:00 night tariff covers the evening and the next morning."""
+    tariff = Tariff(
+        grid_fees=[{"days": ["mon"], "start": "22:00", "end": "06:00", "fee": 3}]
+    )
+    monday = fees(tariff, datetime(2023, 9, 18, tzinfo=TZ), 24)
+    tuesday = fees(tariff, datetime(2023, 9, 19, tzinfo=TZ), 24)
+    assert monday[21] == 0
+    assert monday[22] == monday[23] == 3
+    assert tuesday[0] == tuesday[5] == 3
+    assert tuesday[6] == 0
+    assert tuesday[22] == 0
+
+
+def test_overnight_rule_wraps_the_week() -> None:
+    """Sunday night continues on Monday morning."""
+    tariff = Tariff(
+        grid_fees=[{"days": ["sun"], "start": "23:00", "end": "01:00", "fee": 2}]
+    )
+    monday = fees(tariff, datetime(2023, 9, 18, tzinfo=TZ), 24)
+    assert monday[0] == 2
+    assert monday[1] == 0
+
+
+def test_vat_and_adder() -> None:
+    tariff = Tariff(fixed_adder=1.0, vat=24.0)
+    final = tariff.apply(hourly(datetime(2023, 9, 18, tzinfo=TZ), 1), TZ)
+    assert final.values[0] == round(11 * 1.24, 3)
@@ -0,0 +1,65 @@
+"""Tests for the template functions."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.template import Template, TemplateEnvironment
+
+from custom_components.entsoe.templates import (
+    async_setup_template_functions,
+    async_unload_template_functions,
+)
+
+SOURCES = (
+    "{{ entsoe_price_at('FI') }}",
+    "{{ entsoe_rank('FI') }}",
+    "{{ entsoe_cheapest_hours('FI', 2) }}",
+)
+
+
+@pytest.mark.parametrize(
+    "render_kwargs",
+    [
+        {},
+        {"strict": True},
+        {"log_fn": lambda level, message: None},
+        {"strict": True, "log_fn": lambda level, message: None},
+    ],
+    ids=["default", "strict", "log_fn", "strict_log_fn"],
+)
+async def test_functions_in_every_environment(
+    hass: HomeAssistant, render_kwargs: dict
+) -> None:
+    """The functions render in every trusted environment, None without a zone."""
+    # an environment cached before the integration is set up gets them as well
+    Template("{{ 1 }}", hass).async_render(**render_kwargs)
+    async_setup_template_functions(hass)
+
+    for source in SOURCES:
+        template = Template(source, hass)
+        assert template.async_render(**render_kwargs) in (None, [])
+    async_unload_template_functions(hass)
+
+
+async def test_not_in_limited_templates(hass: HomeAssistant) -> None:
+    """Limited templates render untrusted input and don't get the functions."""
+    async_setup_template_functions(hass)
+    for source in SOURCES:
+        with pytest.raises(TemplateError):
+            Template(source, hass).async_render(limited=True)
+    async_unload_template_functions(hass)
+
+
+async def test_unload_removes_functions_and_hook(hass: HomeAssistant) -> None:
+    """Unloading restores the environment class and drops the functions."""
+    original = TemplateEnvironment.__init__
+    async_setup_template_functions(hass)
+    assert TemplateEnvironment.__init__ is not original
+
+    async_unload_template_functions(hass)
+    assert TemplateEnvironment.__init__ is original
+    for render_kwargs in ({}, {"log_fn": lambda level, message: None}):
+        with pytest.raises(TemplateError):
+            Template(SOURCES[0], hass).async_render(**render_kwargs)
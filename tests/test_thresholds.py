@@ -0,0 +1,88 @@
+"""Tests for the price thresholds and their binary sensors."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta
+import math
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from pytest_homeassistant_custom_component.common import (
+    MockEntityPlatform,
+    async_fire_time_changed,
+)
+
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from custom_components.entsoe.binary_sensor import EntsoeThresholdSensor
+from custom_components.entsoe.coordinator import EntsoeCoordinator
+from custom_components.entsoe.series import PriceSeries
+from custom_components.entsoe.thresholds import THRESHOLD_SCHEMA, price_transitions
+
+HELSINKI = ZoneInfo("Europe/Helsinki")
+MIDNIGHT = datetime(2023, 10, 29, tzinfo=HELSINKI)
+EPOCH = int(MIDNIGHT.timestamp())
+
+
+def test_transitions_across_midnight() -> None:
+    """A state running over midnight doesn't flip there, a price change does."""
+    series = PriceSeries(EPOCH - 7200, 3600, array("d", [1, 1, 1, 9, math.nan, 1]))
+    transitions = price_transitions(series, below=5)
+    assert list(transitions.epochs) == [
+        EPOCH - 7200,
+        EPOCH + 3600,
+        EPOCH + 7200,
+        EPOCH + 10800,
+        EPOCH + 14400,
+    ]
+    assert transitions.states == [True, False, None, True, None]
+    assert transitions.state_at(EPOCH) is True
+    assert transitions.next_change(EPOCH - 3600) == EPOCH + 3600
+    assert transitions.next_change(EPOCH + 14400) is None
+
+    transitions = price_transitions(series, above=5)
+    assert transitions.state_at(EPOCH + 3600) is True
+    assert transitions.state_at(EPOCH - 7201) is None
+
+
+async def test_sensor_flips_at_the_day_boundary(hass: HomeAssistant, freezer) -> None:
+    """Tomorrow's cheap first hours switch the sensor on at midnight, and off after."""
+    freezer.move_to(MIDNIGHT - timedelta(minutes=30))
+    rule = THRESHOLD_SCHEMA([{"name": "Cheap", "below": 5}])[0]
+    coordinator = EntsoeCoordinator(
+        hass,
+        hubs={"FI": SimpleNamespace(metrics=None)},
+        timezone="FI",
+        thresholds=[rule],
+    )
+    # hourly prices from yesterday's midnight, tomorrow is the 25 hour DST day
+    prices = array("d", [10.0] * 96)
+    prices[48:51] = array("d", [1.0] * 3)
+    start = int((MIDNIGHT - timedelta(days=2)).timestamp())
+    coordinator.data = {"FI": coordinator.split_days(PriceSeries(start, 3600, prices))}
+    # no refreshes, only the sensor's own timer
+    coordinator.update_interval = None
+    sensor = EntsoeThresholdSensor(coordinator, rule)
+    await MockEntityPlatform(hass).async_add_entities([sensor])
+
+    state = hass.states.get(sensor.entity_id)
+    assert state.state == STATE_OFF
+    assert state.attributes["next_change"].timestamp() == EPOCH
+
+    # the end of the cheap hours is 03:00 before the clocks go back, in the fold
+    for when, expected, next_change in (
+        (EPOCH, STATE_ON, EPOCH + 10800),
+        (EPOCH + 10800, STATE_OFF, None),
+    ):
+        freezer.move_to(dt.utc_from_timestamp(when))
+        async_fire_time_changed(hass, dt.utc_from_timestamp(when))
+        await hass.async_block_till_done()
+        state = hass.states.get(sensor.entity_id)
+        assert state.state == expected
+        if next_change is not None:
+            assert state.attributes["next_change"].timestamp() == next_change
+
+    await sensor.async_remove()
+    await coordinator.async_shutdown()
@@ -0,0 +1,51 @@
+"""Tests for the websocket API."""
+from __future__ import annotations
+
+from array import array
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from custom_components.entsoe.const import CONF_COORDINATOR, DOMAIN
+from custom_components.entsoe.coordinator import EntsoeCoordinator
+from custom_components.entsoe.series import PriceSeries
+from custom_components.entsoe.websocket import async_setup_websocket
+
+
+def _set_up_entry(hass: HomeAssistant, prices: list[float]) -> EntsoeCoordinator:
+    """Set up a coordinator for FI serving hourly prices from yesterday on."""
+    coordinator = EntsoeCoordinator(hass, hubs={"FI": None}, timezone="FI")
+    now = int(dt.utcnow().timestamp())
+    series = PriceSeries(now - now % 3600 - 86400, 3600, array("d", prices))
+    hass.data.setdefault(DOMAIN, {})["entry"] = {CONF_COORDINATOR: coordinator}
+    coordinator.async_set_updated_data({"FI": coordinator.split_days(series)})
+    return coordinator
+
+
+async def test_subscription_survives_reload(hass: HomeAssistant, hass_ws_client) -> None:
+    """Updates of the coordinator replacing the subscribed one are forwarded."""
+    prices = [float(hour) for hour in range(72)]
+    old = _set_up_entry(hass, prices)
+    async_setup_websocket(hass)
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": "entsoe/subscribe_prices", "area": "FI"})
+    assert (await client.receive_json())["success"]
+    snapshot = (await client.receive_json())["event"]
+    assert snapshot["type"] == "snapshot"
+
+    # reload: the entry's coordinator is shut down and replaced by a new one
+    hass.data[DOMAIN].pop("entry")
+    await old.async_shutdown()
+    new = _set_up_entry(hass, prices)
+    # the same prices send nothing, a changed one the delta of the new coordinator
+    prices[24] = 100.0  # the current hour
+    now = int(dt.utcnow().timestamp())
+    series = PriceSeries(now - now % 3600 - 86400, 3600, array("d", prices))
+    new.async_set_updated_data({"FI": new.split_days(series)})
+    await hass.async_block_till_done()
+
+    delta = (await client.receive_json())["event"]
+    assert delta["type"] == "delta"
+    assert delta["values"][0] == 100.0
+    await new.async_shutdown()